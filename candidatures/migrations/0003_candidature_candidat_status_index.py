@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 04:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidatures', '0002_analysecv'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidature',
+            index=models.Index(fields=['candidat', 'status'], name='cand_candidat_status_idx'),
+        ),
+    ]
@@ -128,6 +128,11 @@ class Candidature(models.Model):
         
         # Un candidat ne peut postuler qu'une fois pour le même poste
         unique_together = ['candidat', 'poste']
+        
+        # Statistiques par candidat : comptage par statut sans lire les lignes
+        indexes = [
+            models.Index(fields=['candidat', 'status'], name='cand_candidat_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.candidat.username} - {self.poste} ({self.get_status_display()})"
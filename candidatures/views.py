@@ -28,6 +28,7 @@ from .permissions import (
     IsCandidatureOwner, CanCreateCandidature, 
     CanManageCandidatures, CanDeleteCandidature
 )
+from users.permissions import ADMIN_OR_RECRUITER_ROLES
 
 User = get_user_model()
 
@@ -276,7 +277,7 @@ def dashboard_view(request):
     Vue principale du tableau de bord
     """
     # Vérifier que l'utilisateur est un recruteur
-    if request.user.role not in ['recruteur', 'admin']:
+    if request.user.role not in ADMIN_OR_RECRUITER_ROLES:
         return render(request, 'error.html', {
             'message': 'Accès non autorisé. Seuls les recruteurs peuvent accéder au tableau de bord.'
         })
@@ -292,7 +293,7 @@ def dashboard_stats_api(request):
     API pour récupérer les statistiques du tableau de bord avec mise en cache
     """
     try:
-        if request.user.role not in ['recruteur', 'admin']:
+        if request.user.role not in ADMIN_OR_RECRUITER_ROLES:
             return Response({'error': 'Accès non autorisé'}, status=403)
         
         # Clé de cache pour les statistiques
@@ -412,7 +413,7 @@ def dashboard_charts_data(request):
     API pour les données des graphiques
     """
     try:
-        if request.user.role not in ['recruteur', 'admin']:
+        if request.user.role not in ADMIN_OR_RECRUITER_ROLES:
             return Response({'error': 'Accès non autorisé'}, status=403)
         
         chart_type = request.GET.get('type', 'evolution')
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_preferences(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    EmailPreferences = apps.get_model('notifications', 'EmailPreferences')
+    user_ids = User.objects.filter(email_preferences__isnull=True).values_list('id', flat=True)
+    EmailPreferences.objects.bulk_create(
+        [EmailPreferences(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_preferences, migrations.RunPython.noop),
+    ]
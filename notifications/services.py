@@ -2,6 +2,7 @@ from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from candidatures.models import Candidature
 from .models import EmailPreferences, EmailNotificationLog
 import logging
 
@@ -18,6 +19,11 @@ class EmailNotificationService:
         preferences, created = EmailPreferences.objects.get_or_create(user=user)
         return preferences
     
+    @staticmethod
+    def _load_candidature_with_candidat(candidature_id):
+        """Load a candidature with its candidate joined in a single query"""
+        return Candidature.objects.select_related('candidat').get(pk=candidature_id)
+    
     @staticmethod
     def _log_notification(recipient, notification_type, subject, candidature=None, success=True, error_message=None):
         """Log email notification"""
@@ -31,9 +37,20 @@ class EmailNotificationService:
         )
     
     @staticmethod
-    def send_candidature_status_update(candidature):
-        """Send email to candidate when candidature status is updated"""
+    def send_candidature_status_update(candidature=None, candidature_id=None):
+        """
+        Send email to candidate when candidature status is updated.
+        
+        Callers passing an instance should load it with select_related('candidat');
+        when only the id is known, pass candidature_id and the candidate is joined here.
+        """
+        if candidature is None and candidature_id is None:
+            raise ValueError("send_candidature_status_update needs candidature or candidature_id")
+        
         try:
+            if candidature is None:
+                candidature = EmailNotificationService._load_candidature_with_candidat(candidature_id)
+            
             # Check user preferences
             preferences = EmailNotificationService._get_or_create_preferences(candidature.candidat)
             if not preferences.receive_status_updates:
@@ -233,3 +250,7 @@ class EmailNotificationService:
                 )
             except:
                 pass
+
+
+# Shared stateless instance, import this rather than instantiating the service
+email_notification_service = EmailNotificationService()
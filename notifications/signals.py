@@ -1,7 +1,19 @@
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
+from django.contrib.auth import get_user_model
 from candidatures.models import Candidature
-from .services import EmailNotificationService
+from .models import EmailPreferences
+from .services import email_notification_service
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def handle_user_created(sender, instance, created, **kwargs):
+    """Create default email preferences for new users"""
+    # Fixtures loaded with loaddata carry their own preferences rows
+    if created and not kwargs.get('raw'):
+        EmailPreferences.objects.create(user=instance)
 
 
 @receiver(post_save, sender=Candidature)
@@ -9,7 +21,7 @@ def handle_candidature_created(sender, instance, created, **kwargs):
     """Handle new candidature creation"""
     if created:
         # Send notification to recruiters about new candidature
-        EmailNotificationService.send_new_candidature_notification(instance)
+        email_notification_service.send_new_candidature_notification(instance)
 
 
 @receiver(pre_save, sender=Candidature)
@@ -39,12 +51,12 @@ def handle_candidature_updated(sender, instance, created, **kwargs):
     if not created:
         # Send status update notification if status changed
         if hasattr(instance, '_status_changed') and instance._status_changed:
-            EmailNotificationService.send_candidature_status_update(instance)
+            email_notification_service.send_candidature_status_update(instance)
             delattr(instance, '_status_changed')
             if hasattr(instance, '_old_status'):
                 delattr(instance, '_old_status')
         
         # Send recruiter assignment notification
         if hasattr(instance, '_recruiter_assigned') and instance._recruiter_assigned:
-            EmailNotificationService.send_recruiter_assignment_notification(instance)
+            email_notification_service.send_recruiter_assignment_notification(instance)
             delattr(instance, '_recruiter_assigned')
@@ -1,12 +1,14 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.db.models.signals import post_save
+from django.db import IntegrityError, transaction
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APIClient
 from rest_framework import status
 from unittest.mock import patch, MagicMock
 from notifications.models import EmailPreferences, EmailNotificationLog
-from notifications.services import EmailNotificationService
+from notifications.services import EmailNotificationService, email_notification_service
 from candidatures.models import Candidature
 import datetime
 
@@ -16,9 +18,10 @@ User = get_user_model()
 class EmailPreferencesModelTestCase(TestCase):
     """Test cases for EmailPreferences model"""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123',
@@ -41,7 +44,7 @@ class EmailPreferencesModelTestCase(TestCase):
     
     def test_email_preferences_defaults(self):
         """Test default values for email preferences"""
-        preferences = EmailPreferences.objects.create(user=self.user)
+        preferences = EmailPreferences.objects.get(user=self.user)
         
         # Test default values based on your model
         if hasattr(preferences, 'receive_candidature_updates'):
@@ -53,30 +56,27 @@ class EmailPreferencesModelTestCase(TestCase):
     
     def test_email_preferences_str_method(self):
         """Test string representation of email preferences"""
-        preferences = EmailPreferences.objects.create(user=self.user)
+        preferences = EmailPreferences.objects.get(user=self.user)
         expected = f"Préférences email de {self.user.username}"
         # Adapt based on your actual __str__ method
         self.assertIn(self.user.username, str(preferences))
     
     def test_one_preferences_per_user(self):
         """Test that there's only one preferences object per user"""
-        # Create first preferences
-        EmailPreferences.objects.create(user=self.user)
+        # First preferences are created automatically with the user
+        self.assertTrue(EmailPreferences.objects.filter(user=self.user).exists())
         
         # Try to create another one
-        try:
-            EmailPreferences.objects.create(user=self.user)
-            # If no unique constraint, check count
-            count = EmailPreferences.objects.filter(user=self.user).count()
-            self.assertGreaterEqual(count, 1)
-        except Exception:
-            # If unique constraint exists
-            count = EmailPreferences.objects.filter(user=self.user).count()
-            self.assertEqual(count, 1)
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                EmailPreferences.objects.create(user=self.user)
+        
+        count = EmailPreferences.objects.filter(user=self.user).count()
+        self.assertEqual(count, 1)
     
     def test_preferences_update(self):
         """Test updating email preferences"""
-        preferences = EmailPreferences.objects.create(user=self.user)
+        preferences = EmailPreferences.objects.get(user=self.user)
         
         # Update preferences based on available fields
         if hasattr(preferences, 'receive_candidature_updates'):
@@ -89,16 +89,17 @@ class EmailPreferencesModelTestCase(TestCase):
 class EmailNotificationLogModelTestCase(TestCase):
     """Test cases for EmailNotificationLog model"""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.recipient = User.objects.create_user(
+        cls.recipient = User.objects.create_user(
             username='recipient',
             email='recipient@example.com',
             password='testpass123',
             role='candidat'
         )
         
-        self.sender = User.objects.create_user(
+        cls.sender = User.objects.create_user(
             username='sender',
             email='sender@example.com',
             password='testpass123',
@@ -153,31 +154,54 @@ class EmailNotificationLogModelTestCase(TestCase):
 class EmailNotificationServiceTestCase(TestCase):
     """Test cases for EmailNotificationService"""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.candidate = User.objects.create_user(
+        cls.candidate = User.objects.create_user(
             username='candidate',
             email='candidate@example.com',
             password='testpass123',
             role='candidat'
         )
         
-        self.recruiter = User.objects.create_user(
+        cls.recruiter = User.objects.create_user(
             username='recruiter',
             email='recruiter@example.com',
             password='testpass123',
             role='recruteur'
         )
         
-        # Create email preferences
-        EmailPreferences.objects.create(user=self.candidate)
+        # Email preferences are created automatically with the user
         
-        self.service = EmailNotificationService()
+        cls.service = email_notification_service
     
     def test_service_initialization(self):
         """Test EmailNotificationService initialization"""
         self.assertIsInstance(self.service, EmailNotificationService)
     
+    def test_send_candidature_status_update_by_id(self):
+        """Test that passing candidature_id loads the candidate in the same query"""
+        cv_file = SimpleUploadedFile("cv.pdf", b"content", content_type="application/pdf")
+        candidature = Candidature.objects.create(
+            candidat=self.candidate,
+            poste='Id Position',
+            cv=cv_file,
+            status='acceptee'
+        )
+        mail.outbox.clear()
+        
+        # Candidature joined with its candidate, preferences lookup, log insert
+        with self.assertNumQueries(3):
+            self.service.send_candidature_status_update(candidature_id=candidature.id)
+        
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.candidate.email])
+    
+    def test_send_candidature_status_update_requires_candidature(self):
+        """Test that calling without a candidature or id is rejected up front"""
+        with self.assertRaises(ValueError):
+            self.service.send_candidature_status_update()
+    
     @patch('django.core.mail.send_mail')
     def test_send_candidature_status_update(self, mock_send_mail):
         """Test sending candidature status update email"""
@@ -306,26 +330,28 @@ class EmailNotificationServiceTestCase(TestCase):
 class EmailNotificationAPITestCase(TestCase):
     """Test cases for email notification API endpoints"""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.client = APIClient()
-        
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123',
             role='candidat'
         )
         
-        self.admin = User.objects.create_user(
+        cls.admin = User.objects.create_user(
             username='admin',
             email='admin@example.com',
             password='testpass123',
             role='admin'
         )
         
-        # Create email preferences
-        self.preferences = EmailPreferences.objects.create(user=self.user)
+        # Email preferences are created automatically with the user
+        cls.preferences = EmailPreferences.objects.get(user=cls.user)
+    
+    def setUp(self):
+        self.client = APIClient()
     
     def test_get_email_preferences(self):
         """Test getting email preferences via API"""
@@ -340,6 +366,22 @@ class EmailNotificationAPITestCase(TestCase):
             # API endpoint might not be implemented
             self.assertIn(response.status_code, [404, 405])
     
+    def test_my_preferences_created_for_users_without_signal(self):
+        """Test that users inserted without post_save still get their preferences"""
+        user = User.objects.bulk_create([User(username='imported', email='imported@example.com')])[0]
+        self.assertFalse(EmailPreferences.objects.filter(user=user).exists())
+        
+        self.client.force_authenticate(user=user)
+        response = self.client.get('/notifications/api/preferences/my_preferences/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(EmailPreferences.objects.filter(user=user).exists())
+    
+    def test_raw_user_save_skips_preferences(self):
+        """Test that fixture loading (raw saves) does not create preferences"""
+        user = User.objects.bulk_create([User(username='fixture', email='fixture@example.com')])[0]
+        post_save.send(sender=User, instance=user, created=True, raw=True)
+        self.assertFalse(EmailPreferences.objects.filter(user=user).exists())
+    
     def test_unauthorized_access(self):
         """Test unauthorized access to notification endpoints"""
         response = self.client.get('/notifications/api/preferences/')
@@ -350,188 +392,105 @@ class EmailNotificationAPITestCase(TestCase):
 class NotificationIntegrationTestCase(TestCase):
     """Integration tests for notification functionality"""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.candidate = User.objects.create_user(
+        cls.candidate = User.objects.create_user(
             username='candidate',
             email='candidate@example.com',
             password='testpass123',
             role='candidat'
         )
         
-        self.recruiter = User.objects.create_user(
+        cls.recruiter = User.objects.create_user(
             username='recruiter',
             email='recruiter@example.com',
             password='testpass123',
             role='recruteur'
         )
         
-        # Create email preferences
-        EmailPreferences.objects.create(user=self.candidate)
+        # Email preferences are created automatically with the user
         
-        self.service = EmailNotificationService()
+        cls.service = email_notification_service
     
-    @patch('django.core.mail.send_mail')
-    def test_complete_notification_workflow(self, mock_send_mail):
-        """Test complete notification workflow"""
-        mock_send_mail.return_value = True
-        
-        # 1. Create candidature
+    def create_candidature(self, poste):
         cv_file = SimpleUploadedFile("cv.pdf", b"content", content_type="application/pdf")
-        candidature = Candidature.objects.create(
-            candidat=self.candidate,
-            poste='Integration Test Position',
-            cv=cv_file,
-            status='en_attente'
+        return Candidature.objects.create(candidat=self.candidate, poste=poste, cv=cv_file)
+    
+    def test_complete_notification_workflow(self):
+        """Test that submitting then accepting a candidature notifies both sides"""
+        candidature = self.create_candidature('Integration Test Position')
+        
+        # New candidature goes to the recruiter
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.recruiter.email])
+        
+        # Status change goes to the candidate
+        candidature.status = 'acceptee'
+        candidature.save()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[1].to, [self.candidate.email])
+        
+        notification_types = set(
+            EmailNotificationLog.objects.filter(candidature=candidature, success=True)
+            .values_list('notification_type', flat=True)
         )
-        
-        # 2. Send welcome email
-        welcome_result = self.service.send_welcome_email(self.candidate)
-        self.assertTrue(welcome_result)
-        
-        # 3. Send candidature status updates
-        try:
-            # Try new method signature
-            status_result = self.service.send_candidature_status_update(
-                candidature=candidature,
-                old_status='en_attente',
-                new_status='acceptee'
-            )
-        except TypeError:
-            # Try old method signature
-            status_result = self.service.send_candidature_status_update(
-                user=self.candidate,
-                candidature_info={'poste': 'Integration Test Position', 'status': 'acceptee'}
-            )
-        
-        self.assertTrue(status_result)
-        
-        # Verify notifications were logged
-        logs = EmailNotificationLog.objects.filter(recipient=self.candidate)
-        self.assertGreaterEqual(logs.count(), 2)
-        
-        # Verify different notification types exist
-        notification_types = set(logs.values_list('notification_type', flat=True))
-        self.assertIn('welcome', notification_types)
-        # Check for appropriate candidature update type based on your model
-        candidature_types = ['candidature_update', 'status_update', 'application_update']
-        self.assertTrue(any(nt in notification_types for nt in candidature_types))
+        self.assertEqual(notification_types, {'new_candidature', 'status_update'})
     
     def test_notification_preferences_enforcement(self):
-        """Test that notification preferences are properly enforced"""
-        # Get user preferences
-        preferences = EmailPreferences.objects.get(user=self.candidate)
+        """Test that status updates respect the candidate's preferences"""
+        EmailPreferences.objects.filter(user=self.candidate).update(receive_status_updates=False)
+        candidature = self.create_candidature('Preference Test')
+        mail.outbox.clear()
         
-        # Disable all available notification types
-        for field in preferences._meta.fields:
-            if field.name.startswith('receive_') and hasattr(preferences, field.name):
-                setattr(preferences, field.name, False)
-        preferences.save()
+        candidature.status = 'acceptee'
+        candidature.save()
         
-        # Try to send various notifications
-        cv_file = SimpleUploadedFile("cv.pdf", b"content", content_type="application/pdf")
-        candidature = Candidature.objects.create(
-            candidat=self.candidate,
-            poste='Preference Test',
-            cv=cv_file
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(
+            EmailNotificationLog.objects.filter(recipient=self.candidate, notification_type='status_update').exists()
         )
-        
-        # Should not send candidature update
-        try:
-            result = self.service.send_candidature_status_update(
-                candidature=candidature,
-                old_status='en_attente',
-                new_status='acceptee'
-            )
-        except TypeError:
-            result = self.service.send_candidature_status_update(
-                user=self.candidate,
-                candidature_info={'poste': 'Preference Test', 'status': 'acceptee'}
-            )
-        
-        # Result depends on implementation
-        # If preferences are enforced, should be False
-        # If not implemented yet, might be True
-        self.assertIsInstance(result, bool)
     
     def test_bulk_notification_sending(self):
-        """Test sending notifications to multiple users"""
-        # Create multiple users
-        users = []
-        for i in range(3):
-            user = User.objects.create_user(
-                username=f'user{i}',
-                email=f'user{i}@example.com',
-                password='testpass123'
+        """Test that a new candidature notifies every opted-in recruiter once"""
+        recruiters = [self.recruiter] + [
+            User.objects.create_user(
+                username=f'recruiter{i}',
+                email=f'recruiter{i}@example.com',
+                password='testpass123',
+                role='recruteur'
             )
-            users.append(user)
-            
-            # Create preferences
-            EmailPreferences.objects.create(user=user)
-        
-        # Send notifications to all users
-        successful_sends = 0
-        for user in users:
-            try:
-                result = self.service.send_system_notification(
-                    user=user,
-                    subject='Bulk Notification',
-                    message='This is a bulk notification test.'
-                )
-                if result:
-                    successful_sends += 1
-            except (AttributeError, TypeError):
-                # Method might not exist or have different signature
-                result = self.service.send_welcome_email(user)
-                if result:
-                    successful_sends += 1
-        
-        # Verify at least one notification was sent
-        self.assertGreaterEqual(successful_sends, 0)
-    
-    def test_notification_error_handling(self):
-        """Test notification error handling and recovery"""
-        # Create user without email preferences
-        user_no_prefs = User.objects.create_user(
-            username='no_prefs',
-            email='noprefs@example.com',
-            password='testpass123'
-        )
-        
-        # Try to send notification
-        result = self.service.send_welcome_email(user_no_prefs)
-        
-        # Should handle gracefully
-        self.assertIsInstance(result, bool)
+            for i in range(3)
+        ]
+        EmailPreferences.objects.filter(user=recruiters[-1]).update(receive_new_candidature_notifications=False)
         
-        # Check if preferences were created automatically
-        prefs_exist = EmailPreferences.objects.filter(user=user_no_prefs).exists()
-        # Depending on implementation, preferences might be auto-created
-        self.assertIsInstance(prefs_exist, bool)
+        candidature = self.create_candidature('Bulk Test')
         
-        self.service = EmailNotificationService()
+        notified = set(
+            EmailNotificationLog.objects.filter(candidature=candidature, notification_type='new_candidature')
+            .values_list('recipient_id', flat=True)
+        )
+        self.assertEqual(notified, {user.pk for user in recruiters[:-1]})
+        self.assertEqual(len(mail.outbox), 3)
     
-    @patch('notifications.services.send_mail')
-    def test_send_candidature_status_update(self, mock_send_mail):
-        """Test sending candidature status change notification"""
-        mock_send_mail.return_value = True
-        
-        # Update status to trigger notification
-        self.candidature.status = 'acceptee'
-        self.candidature.save()
+    def test_notification_error_handling(self):
+        """Test that a mail failure is logged instead of raised"""
+        candidature = self.create_candidature('Error Test')
         
-        result = self.service.send_candidature_status_update(self.candidature)
+        with patch('notifications.services.send_mail', side_effect=ConnectionError('SMTP down')):
+            self.service.send_candidature_status_update(candidature)
         
-        # Should send email if preferences allow
-        mock_send_mail.assert_called_once()
-
+        log = EmailNotificationLog.objects.get(recipient=self.candidate, notification_type='status_update')
+        self.assertFalse(log.success)
+        self.assertIn('SMTP down', log.error_message)
 
 class EmailNotificationLogTestCase(TestCase):
     """Test cases for email notification logging"""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='test_user',
             email='test@example.com',
             password='testpass123',
@@ -551,34 +510,3 @@ class EmailNotificationLogTestCase(TestCase):
         self.assertEqual(log.notification_type, 'candidature_status_update')
         self.assertTrue(log.success)
 
-
-class NotificationIntegrationTestCase(TestCase):
-    """Integration tests for notification system"""
-    
-    def setUp(self):
-        """Set up test data"""
-        self.candidate = User.objects.create_user(
-            username='candidate',
-            email='candidate@example.com',
-            password='testpass123',
-            role='candidat'
-        )
-    
-    def test_complete_notification_workflow(self):
-        """Test complete notification workflow"""
-        # Create candidature
-        cv_file = SimpleUploadedFile(
-            "test_cv.pdf",
-            b"fake pdf content",
-            content_type="application/pdf"
-        )
-        
-        candidature = Candidature.objects.create(
-            candidat=self.candidate,
-            poste='Full Stack Developer',
-            cv=cv_file,
-            status='en_attente'
-        )
-        
-        # Check that candidature was created
-        self.assertEqual(candidature.status, 'en_attente')
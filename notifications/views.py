@@ -10,18 +10,20 @@ class EmailPreferencesViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing email preferences
     """
+    queryset = EmailPreferences.objects.select_related('user')
     serializer_class = EmailPreferencesSerializer
     permission_classes = [IsAuthenticated]
     
-    def get_queryset(self):
+    def filter_queryset(self, queryset):
         """Only return current user's preferences"""
-        return EmailPreferences.objects.filter(user=self.request.user)
+        return super().filter_queryset(queryset).filter(user=self.request.user)
     
     def get_object(self):
-        """Get or create preferences for current user"""
-        preferences, created = EmailPreferences.objects.get_or_create(
-            user=self.request.user
-        )
+        """
+        Get preferences for current user. Usually created alongside the user, but
+        users inserted without post_save (bulk_create, imports) get them here.
+        """
+        preferences, created = EmailPreferences.objects.get_or_create(user=self.request.user)
         return preferences
     
     @action(detail=False, methods=['get'])
@@ -47,23 +49,24 @@ class EmailNotificationLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing email notification logs (read-only)
     """
+    queryset = EmailNotificationLog.objects.select_related('recipient', 'candidature')
     serializer_class = EmailNotificationLogSerializer
     permission_classes = [IsAuthenticated]
     
-    def get_queryset(self):
+    def filter_queryset(self, queryset):
         """Filter logs based on user role"""
+        queryset = super().filter_queryset(queryset)
         user = self.request.user
         
         if user.is_admin:
             # Admins can see all logs
-            return EmailNotificationLog.objects.all()
-        else:
-            # Users can only see their own logs
-            return EmailNotificationLog.objects.filter(recipient=user)
+            return queryset
+        # Users can only see their own logs
+        return queryset.filter(recipient=user)
     
     @action(detail=False, methods=['get'])
     def my_logs(self, request):
         """Get current user's notification logs"""
-        logs = EmailNotificationLog.objects.filter(recipient=request.user)
+        logs = self.get_queryset().filter(recipient=request.user)
         serializer = self.get_serializer(logs, many=True)
         return Response(serializer.data)
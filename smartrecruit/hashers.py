@@ -0,0 +1,17 @@
+"""
+Password hashers for SmartRecruit
+"""
+
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with the OWASP minimum parameters: 46 MiB of memory, one pass, one lane.
+    Django's defaults (100 MiB, two passes, eight lanes) cost several times
+    more memory and CPU per login.
+    """
+    
+    time_cost = 1
+    memory_cost = 47104
+    parallelism = 1
@@ -0,0 +1,55 @@
+"""
+Logging handlers for SmartRecruit
+"""
+
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueuedFileHandler(QueueHandler):
+    """
+    File handler that writes on a background thread.
+    Records are formatted and queued by the caller; a QueueListener performs
+    the blocking file I/O so request threads never wait on the disk.
+    
+    The listener thread and the log file are only created by the first record,
+    so processes that never log here (management commands, tests) stay clean.
+    When the queue is full, records are dropped silently rather than block.
+    """
+    
+    def __init__(self, filename, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.listener = QueueListener(self.queue, logging.FileHandler(filename, delay=True))
+        self.listener_lock = threading.Lock()
+        self.listener_started = False
+    
+    def start_listener(self):
+        """Start the writer thread once, on first use"""
+        with self.listener_lock:
+            if not self.listener_started:
+                self.listener.start()
+                atexit.register(self.stop_listener)
+                self.listener_started = True
+    
+    def stop_listener(self):
+        """Flush queued records, stop the writer thread and close the file"""
+        with self.listener_lock:
+            if not self.listener_started:
+                return
+            atexit.unregister(self.stop_listener)
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener_started = False
+    
+    def enqueue(self, record):
+        if not self.listener_started:
+            self.start_listener()
+        # Drop records rather than block when the writer falls behind
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
@@ -2,182 +2,364 @@
 Custom Security Middlewares for SmartRecruit
 """
 
+import re
 import time
+from uuid import uuid4
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.http import HttpResponseForbidden
-from django.core.cache import cache
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
 from django.conf import settings
-from django.utils.deprecation import MiddlewareMixin
 import logging
 
 logger = logging.getLogger(__name__)
 
+# (path prefixes, cache key prefix, max requests per hour, description, error message)
+RATE_LIMIT_RULES = (
+    (('/api-auth/login/', '/admin/login/'), 'login_attempts', 5, 'login attempts',
+     'Too many login attempts. Please try again later.'),
+    (('/api/',), 'api_requests', 1000, 'API requests',
+     'API rate limit exceeded. Please try again later.'),
+)
 
-class SecurityHeadersMiddleware(MiddlewareMixin):
+# Known scanner user agents and common XSS keywords, matched case-insensitively
+SUSPICIOUS_RE = re.compile(
+    r'sqlmap|nikto|nessus|burp|nmap|script|alert|onload|onerror',
+    re.IGNORECASE
+)
+
+# Rate limit keys currently over their limit, mapped to the monotonic time their
+# local block expires. Lets repeat offenders be rejected without a cache round trip.
+BLOCKED_KEYS_TTL = 60
+BLOCKED_KEYS_MAX_SIZE = 8192
+_blocked_keys = {}
+
+# Requests slower than this are logged
+SLOW_REQUEST_THRESHOLD_NS = 2_000_000_000
+
+# Process-wide Redis client used for rate limit counters
+REDIS_MAX_CONNECTIONS = 64
+_redis_client = None
+_rolling_window_script = None
+
+RATE_LIMIT_WINDOW = 3600  # 1 hour
+
+# Backends whose incr() keeps the key's expiry. BaseCache.incr (DatabaseCache,
+# file cache) is a get() + set() that resets the TTL to the default timeout.
+TTL_PRESERVING_INCR_BACKENDS = (LocMemCache, RedisCache)
+
+# Rolling window rate limiter: one sorted set of request timestamps (ms) per key.
+# Drops entries older than the window, then records the request unless the limit
+# is reached. Returns the request count including this one, or limit + 1 if denied.
+# The member (ARGV[4]) comes from the caller: before Redis 7 math.random() is
+# reseeded identically on every EVAL, so same-millisecond hits would collide.
+ROLLING_WINDOW_LUA = """
+local now, limit, window = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window * 1000)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    return limit + 1
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], window)
+return count + 1
+"""
+
+# Constant security headers, built once at import time
+SECURITY_HEADERS = (
+    ('Content-Security-Policy', (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.jsdelivr.net; "
+        "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://cdn.jsdelivr.net; "
+        "font-src 'self' https://fonts.gstatic.com; "
+        "img-src 'self' data: https:; "
+        "connect-src 'self'; "
+        "frame-ancestors 'none';"
+    )),
+    ('Referrer-Policy', 'strict-origin-when-cross-origin'),
+    ('Permissions-Policy', 'geolocation=(), microphone=(), camera=()'),
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'DENY'),
+    ('X-XSS-Protection', '1; mode=block'),
+)
+
+
+def get_client_ip(request):
+    """Get the real client IP address, resolved once per request"""
+    ip = getattr(request, '_client_ip', None)
+    if ip is None:
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            # partition avoids building the full list of proxy hops
+            ip = x_forwarded_for.partition(',')[0].strip()
+        else:
+            ip = request.META.get('REMOTE_ADDR')
+        request._client_ip = ip
+    return ip
+
+
+def get_redis_client():
     """
-    Middleware to add security headers to all responses
+    Return a Redis client for the default cache location, or None for other backends.
+    The client and its connection pool are created once per process and shared by
+    all threads, instead of one pool per thread-local cache handler.
     """
-    
-    def process_response(self, request, response):
-        # Content Security Policy
-        response['Content-Security-Policy'] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.jsdelivr.net; "
-            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://cdn.jsdelivr.net; "
-            "font-src 'self' https://fonts.gstatic.com; "
-            "img-src 'self' data: https:; "
-            "connect-src 'self'; "
-            "frame-ancestors 'none';"
+    global _redis_client, _rolling_window_script
+    if _redis_client is None and isinstance(caches['default'], RedisCache):
+        import redis
+        pool = redis.ConnectionPool.from_url(
+            settings.CACHES['default']['LOCATION'],
+            max_connections=REDIS_MAX_CONNECTIONS
         )
-        
-        # Additional security headers
-        response['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-        response['Permissions-Policy'] = 'geolocation=(), microphone=(), camera=()'
-        response['X-Content-Type-Options'] = 'nosniff'
-        response['X-Frame-Options'] = 'DENY'
-        response['X-XSS-Protection'] = '1; mode=block'
-        
-        # Remove server information
-        if 'Server' in response:
-            del response['Server']
-            
-        return response
+        _redis_client = redis.Redis(connection_pool=pool)
+        _rolling_window_script = _redis_client.register_script(ROLLING_WINDOW_LUA)
+    return _redis_client
 
 
-class RateLimitMiddleware(MiddlewareMixin):
+def get_window_key(cache_key):
+    """Scope a rate limit key to the current fixed RATE_LIMIT_WINDOW"""
+    return f'{cache_key}:{int(time.time()) // RATE_LIMIT_WINDOW}'
+
+
+def is_blocked_locally(cache_key):
+    """Check the in-process block list for a rate limit key"""
+    expires_at = _blocked_keys.get(cache_key)
+    if expires_at is None:
+        return False
+    if expires_at < time.monotonic():
+        _blocked_keys.pop(cache_key, None)
+        return False
+    return True
+
+
+def block_locally(cache_key):
+    """Reject a rate limit key in-process for BLOCKED_KEYS_TTL seconds"""
+    if len(_blocked_keys) >= BLOCKED_KEYS_MAX_SIZE:
+        # Drop the oldest entry to keep memory bounded
+        _blocked_keys.pop(next(iter(_blocked_keys)), None)
+    _blocked_keys[cache_key] = time.monotonic() + BLOCKED_KEYS_TTL
+
+
+class SmartRecruitMiddleware:
     """
-    Simple rate limiting middleware to prevent abuse
+    Middleware combining rate limiting, security auditing, security headers
+    and performance monitoring in a single request/response pass.
+    Natively sync and async so ASGI deployments skip the sync/async adapters.
     """
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
-        super().__init__(get_response)
+        # DEBUG does not change at runtime, so read it once
+        self.debug = settings.DEBUG
+        # Static and media files need neither rate limiting, auditing nor headers
+        self.bypass_prefixes = (settings.STATIC_URL, settings.MEDIA_URL)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        
+        if request.path.startswith(self.bypass_prefixes):
+            return self.get_response(request)
+        
+        response = self.process_request(request)
+        if response is None:
+            response = self.get_response(request)
+        return self.process_response(request, response)
+    
+    async def __acall__(self, request):
+        if request.path.startswith(self.bypass_prefixes):
+            return await self.get_response(request)
+        
+        response = await self.aprocess_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
     
     def process_request(self, request):
-        # Get client IP
-        ip = self.get_client_ip(request)
+        ip = get_client_ip(request)
         
-        # Rate limiting for login attempts
-        if request.path.startswith('/api-auth/login/') or request.path.startswith('/admin/login/'):
-            return self.check_login_rate_limit(ip)
+        # Rate limiting runs first so blocked requests are neither audited nor timed
+        blocked = self.check_rate_limit(request, ip)
+        if blocked is not None:
+            return blocked
         
-        # Rate limiting for API requests
-        if request.path.startswith('/api/'):
-            return self.check_api_rate_limit(ip)
+        self.audit_request(request, ip)
+        request.start_time_ns = time.monotonic_ns()
+        return None
+    
+    async def aprocess_request(self, request):
+        ip = get_client_ip(request)
+        
+        blocked = await self.acheck_rate_limit(request, ip)
+        if blocked is not None:
+            return blocked
         
+        self.audit_request(request, ip)
+        request.start_time_ns = time.monotonic_ns()
         return None
     
-    def get_client_ip(self, request):
-        """Get the real client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+    def process_response(self, request, response):
+        self.add_security_headers(response)
+        self.record_performance(request, response)
+        return response
+    
+    # ============ RATE LIMITING ============
     
-    def check_login_rate_limit(self, ip):
-        """Check rate limit for login attempts"""
-        cache_key = f'login_attempts_{ip}'
-        attempts = cache.get(cache_key, 0)
+    def get_rate_limit_rule(self, request):
+        """Return the rate limit rule matching the request path, if any"""
+        for prefixes, key_prefix, limit, description, message in RATE_LIMIT_RULES:
+            if request.path.startswith(prefixes):
+                return key_prefix, limit, description, message
+        return None
+    
+    def check_rate_limit(self, request, ip):
+        """Simple rate limiting to prevent abuse"""
+        rule = self.get_rate_limit_rule(request)
+        if rule is None:
+            return None
         
-        if attempts >= 5:  # Max 5 login attempts per hour
-            logger.warning(f'Rate limit exceeded for login attempts from IP: {ip}')
-            return HttpResponseForbidden('Too many login attempts. Please try again later.')
+        key_prefix, limit, description, message = rule
+        cache_key = f'{key_prefix}_{ip}'
+        if is_blocked_locally(cache_key):
+            return HttpResponseForbidden(message)
         
-        # Increment counter
-        cache.set(cache_key, attempts + 1, 3600)  # 1 hour timeout
-        return None
+        try:
+            count = self.increment_counter(cache_key, limit)
+        except Exception as e:
+            # Fail open: a cache outage must not turn every request into an error
+            logger.error(f'Rate limit cache unavailable, allowing request from IP {ip}: {e}')
+            return None
+        return self.rate_limit_response(cache_key, ip, count, limit, description, message)
     
-    def check_api_rate_limit(self, ip):
-        """Check rate limit for API requests"""
-        cache_key = f'api_requests_{ip}'
-        requests = cache.get(cache_key, 0)
+    async def acheck_rate_limit(self, request, ip):
+        """Async variant of check_rate_limit using the async cache API"""
+        rule = self.get_rate_limit_rule(request)
+        if rule is None:
+            return None
         
-        if requests >= 1000:  # Max 1000 API requests per hour
-            logger.warning(f'Rate limit exceeded for API requests from IP: {ip}')
-            return HttpResponseForbidden('API rate limit exceeded. Please try again later.')
+        key_prefix, limit, description, message = rule
+        cache_key = f'{key_prefix}_{ip}'
+        if is_blocked_locally(cache_key):
+            return HttpResponseForbidden(message)
         
-        # Increment counter
-        cache.set(cache_key, requests + 1, 3600)  # 1 hour timeout
+        try:
+            count = await self.aincrement_counter(cache_key, limit)
+        except Exception as e:
+            logger.error(f'Rate limit cache unavailable, allowing request from IP {ip}: {e}')
+            return None
+        return self.rate_limit_response(cache_key, ip, count, limit, description, message)
+    
+    def rate_limit_response(self, cache_key, ip, count, limit, description, message):
+        """Return a 403 response once the counter goes over the limit"""
+        if count > limit:
+            block_locally(cache_key)
+            logger.warning(f'Rate limit exceeded for {description} from IP: {ip}')
+            return HttpResponseForbidden(message)
         return None
-
-
-class SecurityAuditMiddleware(MiddlewareMixin):
-    """
-    Middleware to log security-related events
-    """
     
-    def process_request(self, request):
-        # Log suspicious patterns
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
+    def increment_counter(self, cache_key, limit):
+        """Record a hit and return the number of requests in the current window"""
+        if get_redis_client() is not None:
+            # Rolling window evaluated atomically in a single round trip
+            now_ms = time.time_ns() // 1_000_000
+            return _rolling_window_script(
+                keys=[cache.make_and_validate_key(cache_key)],
+                args=[now_ms, limit, RATE_LIMIT_WINDOW, f'{now_ms}:{uuid4().hex}']
+            )
         
-        # Check for common attack patterns
-        suspicious_patterns = [
-            'sqlmap', 'nikto', 'nessus', 'burp', 'nmap',
-            'script', 'alert', 'onload', 'onerror'
-        ]
+        if not isinstance(caches['default'], TTL_PRESERVING_INCR_BACKENDS):
+            # Window-scoped key rewritten with an explicit timeout. Not atomic, so
+            # concurrent hits may be undercounted, but the window never stretches.
+            window_key = get_window_key(cache_key)
+            count = cache.get(window_key, 0) + 1
+            cache.set(window_key, count, RATE_LIMIT_WINDOW)
+            return count
         
-        query_string = request.META.get('QUERY_STRING', '').lower()
-        path = request.path.lower()
+        # Fixed window counter on other cache backends
+        try:
+            return cache.incr(cache_key)
+        except ValueError:
+            # First hit in the window: only the request that adds the key sets the TTL
+            if cache.add(cache_key, 1, RATE_LIMIT_WINDOW):
+                return 1
+            return cache.incr(cache_key)
+    
+    async def aincrement_counter(self, cache_key, limit):
+        """Async variant of increment_counter"""
+        if get_redis_client() is not None:
+            return await sync_to_async(self.increment_counter)(cache_key, limit)
+        
+        if not isinstance(caches['default'], TTL_PRESERVING_INCR_BACKENDS):
+            window_key = get_window_key(cache_key)
+            count = await cache.aget(window_key, 0) + 1
+            await cache.aset(window_key, count, RATE_LIMIT_WINDOW)
+            return count
         
-        for pattern in suspicious_patterns:
-            if pattern in user_agent.lower() or pattern in query_string or pattern in path:
-                logger.warning(
-                    f'Suspicious request detected from {self.get_client_ip(request)}: '
-                    f'Path: {request.path}, UA: {user_agent}, Query: {query_string}'
-                )
-                break
+        try:
+            return await cache.aincr(cache_key)
+        except ValueError:
+            if await cache.aadd(cache_key, 1, RATE_LIMIT_WINDOW):
+                return 1
+            return await cache.aincr(cache_key)
+    
+    # ============ SECURITY AUDIT ============
+    
+    def audit_request(self, request, ip):
+        """Log security-related events"""
+        # Log suspicious patterns
+        meta = request.META
+        user_agent = meta.get('HTTP_USER_AGENT', '')
+        query_string = meta.get('QUERY_STRING', '')
+        
+        # Check for common attack patterns, skipping empty inputs
+        if ((user_agent and SUSPICIOUS_RE.search(user_agent))
+                or (query_string and SUSPICIOUS_RE.search(query_string))
+                or SUSPICIOUS_RE.search(request.path)):
+            logger.warning(
+                f'Suspicious request detected from {ip}: '
+                f'Path: {request.path}, UA: {user_agent}, Query: {query_string}'
+            )
         
         # Log file upload attempts
         if request.FILES:
             logger.info(
-                f'File upload from {self.get_client_ip(request)}: '
+                f'File upload from {ip}: '
                 f'Files: {list(request.FILES.keys())}'
             )
-        
-        return None
     
-    def get_client_ip(self, request):
-        """Get the real client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-
-
-class PerformanceMiddleware(MiddlewareMixin):
-    """
-    Middleware to monitor and log performance metrics
-    """
+    # ============ SECURITY HEADERS ============
     
-    def process_request(self, request):
-        request.start_time = time.time()
-        return None
-    
-    def process_response(self, request, response):
-        if hasattr(request, 'start_time'):
-            duration = time.time() - request.start_time
-            
-            # Log slow requests (> 2 seconds)
-            if duration > 2.0:
-                logger.warning(
-                    f'Slow request detected: {request.method} {request.path} '
-                    f'took {duration:.2f}s from {self.get_client_ip(request)}'
-                )
-            
-            # Add performance header for debugging
-            if settings.DEBUG:
-                response['X-Response-Time'] = f'{duration:.3f}s'
+    def add_security_headers(self, response):
+        """Add security headers to the response"""
+        for header, value in SECURITY_HEADERS:
+            response[header] = value
         
-        return response
+        # Remove server information
+        response.headers.pop('Server', None)
     
-    def get_client_ip(self, request):
-        """Get the real client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+    # ============ PERFORMANCE ============
+    
+    def record_performance(self, request, response):
+        """Monitor and log performance metrics"""
+        start_time_ns = getattr(request, 'start_time_ns', None)
+        if start_time_ns is None:
+            return
+        
+        duration_ns = time.monotonic_ns() - start_time_ns
+        
+        # Log slow requests (> 2 seconds)
+        if duration_ns > SLOW_REQUEST_THRESHOLD_NS:
+            logger.warning(
+                f'Slow request detected: {request.method} {request.path} '
+                f'took {duration_ns / 1e9:.2f}s from {get_client_ip(request)}'
+            )
+        
+        # Add performance header for debugging
+        if self.debug:
+            response['X-Response-Time'] = f'{duration_ns / 1e9:.3f}s'
@@ -95,10 +95,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     # Custom security and performance middleware
-    'smartrecruit.middleware.SecurityHeadersMiddleware',
-    'smartrecruit.middleware.RateLimitMiddleware',
-    'smartrecruit.middleware.SecurityAuditMiddleware',
-    'smartrecruit.middleware.PerformanceMiddleware',
+    'smartrecruit.middleware.SmartRecruitMiddleware',
 ]
 
 ROOT_URLCONF = 'smartrecruit.urls'
@@ -177,6 +174,24 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing: Argon2id first when argon2-cffi is installed, the other
+# hashers stay listed so existing hashes still verify and are upgraded on login
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+try:
+    import argon2
+    PASSWORD_HASHERS.insert(0, 'smartrecruit.hashers.TunedArgon2PasswordHasher')
+except ImportError:
+    pass
+
+# Test runs switch to the MD5 hasher, see smartrecruit.test_runner
+TEST_RUNNER = 'smartrecruit.test_runner.SmartRecruitTestRunner'
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -223,6 +238,16 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20
 }
 
+# Use orjson for JSON rendering if available, fallback to DRF's stdlib renderer
+try:
+    import drf_orjson_renderer
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'drf_orjson_renderer.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+except ImportError:
+    pass
+
 # Configuration IA
 AI_MODELS_DIR = os.path.join(BASE_DIR, 'ai_models')
 os.makedirs(AI_MODELS_DIR, exist_ok=True)
@@ -246,6 +271,13 @@ LOGGING = {
             'filename': os.path.join(BASE_DIR, 'debug.log'),
             'formatter': 'verbose',
         },
+        'security_file': {
+            # Written from a background thread so middleware warnings never block requests
+            'level': 'INFO',
+            'class': 'smartrecruit.log_handlers.QueuedFileHandler',
+            'filename': os.path.join(BASE_DIR, 'security.log'),
+            'formatter': 'verbose',
+        },
     },
     'loggers': {
         'django': {
@@ -258,6 +290,11 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'smartrecruit.middleware': {
+            'handlers': ['security_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -270,21 +307,36 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
 # Cache Configuration
-# Use Redis if available, fallback to database cache
+# Use Redis if available, fallback to database cache.
+# Probed once with a short timeout and no retries so startup never stalls.
 try:
     import redis
-    redis_client = redis.Redis(host='localhost', port=6379, db=1)
-    redis_client.ping()  # Test connection
-    
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
+    redis.Redis(
+        host='localhost', port=6379, db=1,
+        socket_connect_timeout=0.5, retry=Retry(NoBackoff(), 0)
+    ).ping()
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+except redis.exceptions.RedisError:
+    # ConnectionError, and TimeoutError for filtered hosts
+    REDIS_AVAILABLE = False
+
+if REDIS_AVAILABLE:
     CACHES = {
         'default': {
             'BACKEND': 'django.core.cache.backends.redis.RedisCache',
             'LOCATION': config('CACHE_LOCATION', default='redis://localhost:6379/1'),
             'KEY_PREFIX': 'smartrecruit',
             'TIMEOUT': 300,  # 5 minutes default timeout
+            'OPTIONS': {
+                'max_connections': 64,
+            }
         }
     }
-except (ImportError, redis.ConnectionError, redis.exceptions.ConnectionError):
+else:
     # Fallback to database cache if Redis is not available
     CACHES = {
         'default': {
@@ -303,13 +355,10 @@ CACHE_MIDDLEWARE_SECONDS = 600  # 10 minutes
 CACHE_MIDDLEWARE_KEY_PREFIX = 'smartrecruit'
 
 # Session configuration - use database if Redis not available
-try:
-    import redis
-    redis_client = redis.Redis(host='localhost', port=6379, db=1)
-    redis_client.ping()
+if REDIS_AVAILABLE:
     SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
     SESSION_CACHE_ALIAS = 'default'
-except (ImportError, redis.ConnectionError, redis.exceptions.ConnectionError):
+else:
     SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 
 # Performance optimizations
@@ -0,0 +1,25 @@
+"""
+Test settings for SmartRecruit project.
+
+Usage: python manage.py test --settings=smartrecruit.settings_test
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# In-memory SQLite database, nothing is written to disk during test runs.
+# Each --parallel worker gets its own in-memory clone.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {'NAME': ':memory:'},
+    }
+}
+
+# Local memory cache, tests never depend on Redis or the cache table
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
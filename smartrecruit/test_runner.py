@@ -0,0 +1,24 @@
+"""
+Test runner for SmartRecruit
+"""
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class SmartRecruitTestRunner(DiscoverRunner):
+    """
+    Runs every test with the fast MD5 hasher, whatever settings module is used.
+    The suite creates many users; the production hashers would dominate its runtime.
+    """
+    
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.fast_hashing = override_settings(
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']
+        )
+        self.fast_hashing.enable()
+    
+    def teardown_test_environment(self, **kwargs):
+        self.fast_hashing.disable()
+        super().teardown_test_environment(**kwargs)
@@ -27,13 +27,30 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
     
+    # Columns needed by the changelist: list_display, list_filter, ordering and __str__
+    changelist_fields = (
+        'id', 'username', 'email', 'first_name', 'last_name', 'role',
+        'is_active', 'is_staff', 'is_superuser', 'created_at'
+    )
+    
     def get_queryset(self, request):
         """
         Filter users based on admin role
         """
         qs = super().get_queryset(request)
-        if request.user.is_superuser:
-            return qs
-        elif hasattr(request.user, 'is_admin') and request.user.is_admin:
+        
+        # Skip password hashes and other unused columns on the changelist only,
+        # the change form needs every field
+        match = request.resolver_match
+        if match and match.url_name == f'{self.opts.app_label}_{self.opts.model_name}_changelist':
+            qs = qs.only(*self.changelist_fields)
+        
+        # The admin calls get_queryset several times per page, resolve the role once
+        sees_all_users = getattr(request, '_user_admin_sees_all', None)
+        if sees_all_users is None:
+            user = request.user
+            sees_all_users = request._user_admin_sees_all = user.is_superuser or user.is_admin
+        
+        if sees_all_users:
             return qs
         return qs.filter(id=request.user.id)
@@ -0,0 +1,12 @@
+"""
+Cache keys shared by the user views and signal receivers.
+Kept free of view imports so users.signals stays light at app load.
+"""
+from django.core.cache import cache
+
+USERS_LIST_STATE_CACHE_KEY = 'users:list_state'
+
+
+def invalidate_users_list_state():
+    """Drop the cached user list state used for the list ETag"""
+    cache.delete(USERS_LIST_STATE_CACHE_KEY)
@@ -29,8 +29,8 @@ class CustomUserCreationForm(UserCreationForm):
         widget=forms.TextInput(attrs={'class': 'form-control'})
     )
     role = forms.ChoiceField(
-        choices=[('candidat', 'Candidat - Je cherche un emploi'), 
-                ('recruteur', 'Recruteur - Je recrute des talents')],
+        choices=[(User.Role.CANDIDATE, 'Candidat - Je cherche un emploi'),
+                 (User.Role.RECRUITER, 'Recruteur - Je recrute des talents')],
         required=True,
         widget=forms.Select(attrs={'class': 'form-select'})
     )
@@ -80,6 +80,13 @@ class UserProfileForm(forms.ModelForm):
             field.required = True
         self.fields['phone'].required = False
 
+    def save(self, commit=True):
+        """Write only the profile columns that were edited"""
+        user = super().save(commit=False)
+        if commit and self.has_changed():
+            user.save(update_fields=self.changed_data + ['updated_at'])
+        return user
+
 
 class CustomAuthenticationForm(AuthenticationForm):
     """
@@ -1,8 +1,19 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from notifications.models import EmailPreferences
+from users.cache import invalidate_users_list_state
 
 User = get_user_model()
 
+# (username, email, password, first_name, last_name, role)
+SAMPLE_USERS = [
+    ('admin_user', 'admin@smartrecruit.com', 'admin123456', 'Admin', 'User', User.Role.ADMIN),
+    ('recruteur_user', 'recruteur@smartrecruit.com', 'recruteur123456', 'Recruteur', 'User', User.Role.RECRUITER),
+    ('candidat_user', 'candidat@smartrecruit.com', 'candidat123456', 'Candidat', 'User', User.Role.CANDIDATE),
+]
+
 
 class Command(BaseCommand):
     help = 'Create sample users with different roles for testing'
@@ -24,49 +35,46 @@ class Command(BaseCommand):
 
     def create_sample_users(self):
         """Create sample users for testing"""
+        existing = set(
+            User.objects.filter(
+                username__in=[sample[0] for sample in SAMPLE_USERS]
+            ).values_list('username', flat=True)
+        )
         
-        # Create admin user
-        if not User.objects.filter(username='admin_user').exists():
-            admin_user = User.objects.create_user(
-                username='admin_user',
-                email='admin@smartrecruit.com',
-                password='admin123456',
-                first_name='Admin',
-                last_name='User',
-                role='admin'
-            )
-            self.stdout.write(
-                self.style.SUCCESS(f'Created admin user: {admin_user.username}')
+        to_create = [
+            User(
+                username=username,
+                email=email,
+                password=make_password(password),
+                first_name=first_name,
+                last_name=last_name,
+                role=role
             )
-
-        # Create recruiter user
-        if not User.objects.filter(username='recruteur_user').exists():
-            recruiter_user = User.objects.create_user(
-                username='recruteur_user',
-                email='recruteur@smartrecruit.com',
-                password='recruteur123456',
-                first_name='Recruteur',
-                last_name='User',
-                role='recruteur'
-            )
-            self.stdout.write(
-                self.style.SUCCESS(f'Created recruiter user: {recruiter_user.username}')
-            )
-
-        # Create candidate user
-        if not User.objects.filter(username='candidat_user').exists():
-            candidate_user = User.objects.create_user(
-                username='candidat_user',
-                email='candidat@smartrecruit.com',
-                password='candidat123456',
-                first_name='Candidat',
-                last_name='User',
-                role='candidat'
+            for username, email, password, first_name, last_name, role in SAMPLE_USERS
+            if username not in existing
+        ]
+        if not to_create:
+            self.stdout.write(self.style.WARNING('Sample users already exist'))
+            return
+        
+        with transaction.atomic():
+            User.objects.bulk_create(to_create, ignore_conflicts=True, batch_size=1000)
+            
+            # bulk_create skips post_save: write the rows its receivers would create
+            created_users = list(User.objects.filter(
+                username__in=[user.username for user in to_create]
+            ).only('id', 'username', 'role'))
+            EmailPreferences.objects.bulk_create(
+                [EmailPreferences(user=user) for user in created_users],
+                ignore_conflicts=True
             )
+            transaction.on_commit(invalidate_users_list_state)
+        
+        for user in created_users:
             self.stdout.write(
-                self.style.SUCCESS(f'Created candidate user: {candidate_user.username}')
+                self.style.SUCCESS(f'Created {user.role} user: {user.username}')
             )
-
+        
         self.stdout.write(
             self.style.SUCCESS('Sample users created successfully!')
         )
@@ -1,5 +1,23 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.utils.functional import cached_property
+
+
+class UserAPIManager(models.Manager):
+    """
+    Manager for API reads, deferring credential columns never rendered by serializers
+    """
+    def get_queryset(self):
+        return super().get_queryset().defer('password', 'last_login', 'date_joined')
+
+
+class UserRole(models.TextChoices):
+    """
+    User roles, exposed as User.Role. Module level so User.Meta can reference it.
+    """
+    ADMIN = 'admin', 'Administrateur'
+    RECRUITER = 'recruteur', 'Recruteur'
+    CANDIDATE = 'candidat', 'Candidat'
 
 
 class User(AbstractUser):
@@ -8,16 +26,13 @@ class User(AbstractUser):
     Roles: admin, recruteur (recruiter), candidat (candidate)
     """
     
-    ROLE_CHOICES = [
-        ('admin', 'Administrateur'),
-        ('recruteur', 'Recruteur'),
-        ('candidat', 'Candidat'),
-    ]
+    Role = UserRole
+    ROLE_CHOICES = Role.choices
     
     role = models.CharField(
         max_length=20,
-        choices=ROLE_CHOICES,
-        default='candidat',
+        choices=Role.choices,
+        default=Role.CANDIDATE,
         verbose_name='Rôle'
     )
     
@@ -31,22 +46,54 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # objects stays the default manager used by auth and admin
+    objects = UserManager()
+    api_objects = UserAPIManager()
+    
     class Meta:
         verbose_name = 'Utilisateur'
         verbose_name_plural = 'Utilisateurs'
         ordering = ['-created_at']
+        indexes = [
+            # Covers the (created_at, id) keyset used by users_list_view
+            models.Index(fields=['-created_at', '-id'], name='users_created_id_idx'),
+            # Role filters in get_queryset/users_list_view, already in list order
+            models.Index(fields=['role', '-created_at', '-id'], name='users_role_created_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(role__in=UserRole.values),
+                name='users_role_valid',
+            ),
+        ]
+    
+    # Role flags memoized on the instance, see clear_role_cache
+    ROLE_PROPERTIES = ('is_admin', 'is_recruiter', 'is_candidate')
     
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
     
-    @property
+    def clear_role_cache(self):
+        """Drop memoized role flags so they are recomputed from role"""
+        for name in self.ROLE_PROPERTIES:
+            self.__dict__.pop(name, None)
+    
+    def save(self, *args, **kwargs):
+        self.clear_role_cache()
+        super().save(*args, **kwargs)
+    
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.clear_role_cache()
+    
+    @cached_property
     def is_admin(self):
-        return self.role == 'admin'
+        return self.role == self.Role.ADMIN
     
-    @property
+    @cached_property
     def is_recruiter(self):
-        return self.role == 'recruteur'
+        return self.role == self.Role.RECRUITER
     
-    @property
+    @cached_property
     def is_candidate(self):
-        return self.role == 'candidat'
+        return self.role == self.Role.CANDIDATE
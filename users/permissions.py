@@ -1,51 +1,66 @@
 from rest_framework.permissions import BasePermission
+from .models import User
 
+ADMIN_OR_RECRUITER_ROLES = frozenset({User.Role.ADMIN, User.Role.RECRUITER})
 
-class IsAdminUser(BasePermission):
+
+class RequestCachedPermission(BasePermission):
     """
-    Permission class for admin users only
+    Base class for role permissions, memoizing has_permission on the request.
+    The result only depends on request.user, so repeated evaluations are free.
     """
     def has_permission(self, request, view):
-        return (
-            request.user and 
-            request.user.is_authenticated and 
-            request.user.is_admin
-        )
+        cache = getattr(request, '_permission_cache', None)
+        if cache is None:
+            cache = request._permission_cache = {}
+        
+        key = type(self)
+        if key not in cache:
+            cache[key] = self.check_permission(request, view)
+        return cache[key]
+    
+    def check_permission(self, request, view):
+        return True
+
+
+class IsAdminUser(RequestCachedPermission):
+    """
+    Permission class for admin users only
+    """
+    message = 'Permission denied. Admin access required.'
+    
+    def check_permission(self, request, view):
+        user = request.user
+        return user.is_authenticated and user.is_admin
 
 
-class IsRecruiterUser(BasePermission):
+class IsRecruiterUser(RequestCachedPermission):
     """
     Permission class for recruiter users
     """
-    def has_permission(self, request, view):
-        return (
-            request.user and 
-            request.user.is_authenticated and 
-            request.user.is_recruiter
-        )
+    def check_permission(self, request, view):
+        user = request.user
+        return user.is_authenticated and user.is_recruiter
 
 
-class IsCandidateUser(BasePermission):
+class IsCandidateUser(RequestCachedPermission):
     """
     Permission class for candidate users
     """
-    def has_permission(self, request, view):
-        return (
-            request.user and 
-            request.user.is_authenticated and 
-            request.user.is_candidate
-        )
+    def check_permission(self, request, view):
+        user = request.user
+        return user.is_authenticated and user.is_candidate
 
 
-class IsAdminOrRecruiter(BasePermission):
+class IsAdminOrRecruiter(RequestCachedPermission):
     """
     Permission class for admin or recruiter users
     """
-    def has_permission(self, request, view):
+    def check_permission(self, request, view):
+        user = request.user
         return (
-            request.user and 
-            request.user.is_authenticated and 
-            (request.user.is_admin or request.user.is_recruiter)
+            user.is_authenticated and
+            user.role in ADMIN_OR_RECRUITER_ROLES
         )
 
 
@@ -54,8 +69,9 @@ class IsOwnerOrAdmin(BasePermission):
     Permission class allowing owners to edit their own profile or admins to edit any profile
     """
     def has_object_permission(self, request, view, obj):
+        user = request.user
         # Admin users can access any object
-        if request.user.is_admin:
+        if user.is_authenticated and user.is_admin:
             return True
-        # Users can only access their own profile
-        return obj == request.user
+        # Users can only access their own profile, compare keys rather than instances
+        return obj.pk == user.pk
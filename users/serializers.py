@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
 from .models import User
 
 
@@ -7,56 +8,78 @@ class UserSerializer(serializers.ModelSerializer):
     """
     Serializer for User model with role management
     """
-    password = serializers.CharField(write_only=True, validators=[validate_password])
+    # validate_password runs in validate(), after the cheap confirmation check
+    password = serializers.CharField(write_only=True)
     password_confirm = serializers.CharField(write_only=True)
     
     class Meta:
         model = User
-        fields = [
+        fields = (
             'id', 'username', 'email', 'first_name', 'last_name', 
             'phone', 'role', 'is_active', 'created_at', 'updated_at',
             'password', 'password_confirm'
-        ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        )
+        read_only_fields = ('id', 'created_at', 'updated_at')
     
     def validate(self, attrs):
-        if attrs.get('password') != attrs.get('password_confirm'):
+        # password_confirm is only used here, drop it before create/update
+        password = attrs.get('password')
+        password_confirm = attrs.pop('password_confirm', None)
+        if password is None:
+            return attrs
+        
+        if password != password_confirm:
             raise serializers.ValidationError("Les mots de passe ne correspondent pas.")
+        
+        try:
+            validate_password(password)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'password': list(e.messages)})
         return attrs
     
     def create(self, validated_data):
-        validated_data.pop('password_confirm')
+        # create_user hashes the password and inserts the row once
         password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        return User.objects.create_user(password=password, **validated_data)
     
     def update(self, instance, validated_data):
-        validated_data.pop('password_confirm', None)
         password = validated_data.pop('password', None)
         
+        # Only write the columns that actually changed
+        changed_fields = []
         for attr, value in validated_data.items():
-            setattr(instance, attr, value)
+            if getattr(instance, attr) != value:
+                setattr(instance, attr, value)
+                changed_fields.append(attr)
         
         if password:
             instance.set_password(password)
+            changed_fields.append('password')
         
-        instance.save()
+        if changed_fields:
+            instance.save(update_fields=changed_fields + ['updated_at'])
         return instance
 
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(serializers.Serializer):
     """
-    Simplified serializer for listing users
+    Simplified read-only serializer for listing users.
+    Fields are declared explicitly to skip ModelSerializer field introspection.
     """
-    class Meta:
-        model = User
-        fields = [
-            'id', 'username', 'email', 'first_name', 'last_name',
-            'role', 'is_active', 'created_at'
-        ]
-        read_only_fields = ['id', 'created_at']
+    # Model columns read by this serializer, used to restrict list querysets
+    model_fields = (
+        'id', 'username', 'email', 'first_name', 'last_name',
+        'role', 'is_active', 'created_at'
+    )
+    
+    id = serializers.ReadOnlyField()
+    username = serializers.ReadOnlyField()
+    email = serializers.ReadOnlyField()
+    first_name = serializers.ReadOnlyField()
+    last_name = serializers.ReadOnlyField()
+    role = serializers.ReadOnlyField()
+    is_active = serializers.ReadOnlyField()
+    created_at = serializers.DateTimeField(read_only=True)
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
@@ -65,7 +88,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = User
-        fields = [
+        fields = (
             'username', 'email', 'first_name', 'last_name',
             'phone', 'role', 'is_active'
-        ]
+        )
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from .cache import invalidate_users_list_state
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=User)
+def handle_user_changed(sender, **kwargs):
+    """Drop the cached user list state used for the list ETag"""
+    invalidate_users_list_state()
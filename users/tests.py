@@ -1,13 +1,22 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import IntegrityError, connection
+from django.db.models import Count, Q
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
+from django.core.management import call_command
 from django.core.exceptions import ValidationError
 from unittest.mock import patch
+from io import StringIO
 
 User = get_user_model()
 
+# Stored role values, spelled out so tests catch accidental changes to User.Role
+VALID_ROLES = ('admin', 'recruteur', 'candidat')
+
 
 class UserModelTestCase(TestCase):
     """Test cases for custom User model"""
@@ -48,11 +57,9 @@ class UserModelTestCase(TestCase):
     
     def test_user_role_choices(self):
         """Test user role validation"""
-        # Valid roles
-        valid_roles = ['admin', 'recruteur', 'candidat']
-        
-        for role in valid_roles:
-            user = User.objects.create_user(
+        create_user = User.objects.create_user
+        for role in VALID_ROLES:
+            user = create_user(
                 username=f'user_{role}',
                 email=f'{role}@example.com',
                 password='testpass123',
@@ -72,6 +79,46 @@ class UserModelTestCase(TestCase):
         expected = 'testuser (Candidat)'
         self.assertEqual(str(user), expected)
     
+    def test_role_properties_follow_role_changes(self):
+        """Test that memoized role flags are refreshed on save and reload"""
+        user = User.objects.create_user(
+            username='rolechange',
+            email='rolechange@example.com',
+            password='testpass123',
+            role='candidat'
+        )
+        self.assertTrue(user.is_candidate)
+        self.assertFalse(user.is_admin)
+        
+        user.role = 'admin'
+        user.save()
+        self.assertTrue(user.is_admin)
+        self.assertFalse(user.is_candidate)
+        
+        User.objects.filter(pk=user.pk).update(role='recruteur')
+        user.refresh_from_db()
+        self.assertTrue(user.is_recruiter)
+        self.assertFalse(user.is_admin)
+    
+    def test_unknown_role_rejected_by_database(self):
+        """Test that the role check constraint rejects values outside User.Role"""
+        with self.assertRaises(IntegrityError):
+            User.objects.create(username='badrole', role='superviseur')
+    
+    def test_api_manager_defers_credentials(self):
+        """Test that the API manager does not load credential columns"""
+        user = User.objects.create_user(
+            username='apimanager',
+            email='apimanager@example.com',
+            password='testpass123'
+        )
+        api_user = User.api_objects.get(pk=user.pk)
+        self.assertEqual(
+            api_user.get_deferred_fields(),
+            {'password', 'last_login', 'date_joined'}
+        )
+        self.assertEqual(api_user.username, 'apimanager')
+    
     def test_user_email_uniqueness(self):
         """Test that email must be unique"""
         User.objects.create_user(
@@ -101,63 +148,45 @@ class UserModelTestCase(TestCase):
 class UserAPITestCase(TestCase):
     """Test cases for User API endpoints"""
     
-    def setUp(self):
+    client_class = APIClient
+    
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.client = APIClient()
-        
-        # Create test users with different roles
-        self.admin_user = User.objects.create_user(
-            username='admin_test',
-            email='admin@test.com',
-            password='testpass123',
-            role='admin'
-        )
-        
-        self.recruiter_user = User.objects.create_user(
-            username='recruiter_test',
-            email='recruiter@test.com',
-            password='testpass123',
-            role='recruteur'
-        )
-        
-        self.candidate_user = User.objects.create_user(
-            username='candidate_test',
-            email='candidate@test.com',
-            password='testpass123',
-            role='candidat'
-        )
+        # Create test users with different roles, sharing one password hash
+        password = make_password('testpass123')
+        cls.admin_user, cls.recruiter_user, cls.candidate_user = User.objects.bulk_create([
+            User(username='admin_test', email='admin@test.com', password=password, role='admin'),
+            User(username='recruiter_test', email='recruiter@test.com', password=password, role='recruteur'),
+            User(username='candidate_test', email='candidate@test.com', password=password, role='candidat'),
+        ])
+        cls.users_url = reverse('users:user-list')
     
     def test_admin_can_list_all_users(self):
         """Test that admin can see all users"""
         self.client.force_authenticate(user=self.admin_user)
-        response = self.client.get('/users/api/users/')
+        response = self.client.get(self.users_url)
         self.assertIn(response.status_code, [200, 403, 404])
         # Should see all 3 users
         self.assertGreaterEqual(len(response.data.get('results', response.data)), 3)
     
-    def test_recruiter_can_list_users(self):
-        """Test that recruiter can see users"""
-        self.client.force_authenticate(user=self.recruiter_user)
-        response = self.client.get('/users/api/users/')
-        # Recruiter should have some access (based on your permissions)
-        self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_403_FORBIDDEN])
-    
-    def test_candidate_cannot_list_users(self):
-        """Test that candidates cannot list users"""
-        self.client.force_authenticate(user=self.candidate_user)
-        response = self.client.get('/users/api/users/')
-        # Should be forbidden or filtered
-        self.assertIn(response.status_code, [status.HTTP_403_FORBIDDEN, status.HTTP_200_OK])
+    def test_non_admin_list_access(self):
+        """Test that recruiters and candidates get a forbidden or filtered list"""
+        for user in (self.recruiter_user, self.candidate_user):
+            with self.subTest(role=user.role):
+                self.client.force_authenticate(user=user)
+                response = self.client.get(self.users_url)
+                self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_403_FORBIDDEN])
     
     def test_unauthenticated_access_forbidden(self):
         """Test that unauthenticated users cannot access user API"""
-        response = self.client.get('/users/api/users/')
-        self.assertIn(response.status_code, [401, 404])
+        response = self.client.get(self.users_url)
+        self.assertIn(response.status_code, [401, 403])
     
     def test_user_can_view_own_profile(self):
         """Test that users can view their own profile"""
         self.client.force_authenticate(user=self.candidate_user)
-        response = self.client.get(f'/users/api/users/{self.candidate_user.id}/')
+        response = self.client.get(reverse('users:user-detail', args=[self.candidate_user.id]))
         
         if response.status_code == status.HTTP_200_OK:
             self.assertEqual(response.data['username'], 'candidate_test')
@@ -173,7 +202,7 @@ class UserAPITestCase(TestCase):
             'email': 'john.doe@example.com'
         }
         
-        response = self.client.patch(f'/users/api/users/{self.candidate_user.id}/', data)
+        response = self.client.patch(reverse('users:user-detail', args=[self.candidate_user.id]), data)
         
         if response.status_code in [status.HTTP_200_OK, status.HTTP_204_NO_CONTENT]:
             self.candidate_user.refresh_from_db()
@@ -182,82 +211,162 @@ class UserAPITestCase(TestCase):
     def test_admin_can_create_user(self):
         """Test that admin can create new users"""
         self.client.force_authenticate(user=self.admin_user)
-        
         data = {
-            'username': 'newuser',
-            'email': 'newuser@example.com',
+            'username': 'new_user',
+            'email': 'new@test.com',
             'password': 'newpass123',
-            'role': 'candidat'
+            'password_confirm': 'newpass123',
+            'role': 'candidat',
+            'first_name': 'New',
+            'last_name': 'User'
         }
-        
-        response = self.client.post('/users/api/users/', data)
-        
-        if response.status_code == status.HTTP_201_CREATED:
-            self.assertTrue(User.objects.filter(username='newuser').exists())
+        response = self.client.post(self.users_url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
     
     def test_admin_can_change_user_role(self):
         """Test that admin can change user roles"""
         self.client.force_authenticate(user=self.admin_user)
-        
-        # Try to change candidate to recruiter
-        response = self.client.post(f'/users/api/users/{self.candidate_user.id}/change_role/', 
-                                  {'role': 'recruteur'})
-        
-        if response.status_code == status.HTTP_200_OK:
-            self.candidate_user.refresh_from_db()
-            self.assertEqual(self.candidate_user.role, 'recruteur')
+        response = self.client.post(
+            reverse('users:user-change-role', args=[self.candidate_user.id]),
+            {'role': 'recruteur'}
+        )
+        self.assertIn(response.status_code, [200, 403, 404])
+        role = User.objects.filter(pk=self.candidate_user.pk).values_list('role', flat=True)[0]
+        self.assertEqual(role, 'recruteur')
     
     def test_admin_can_toggle_user_active_status(self):
         """Test that admin can activate/deactivate users"""
         self.client.force_authenticate(user=self.admin_user)
         
         # Deactivate user
-        response = self.client.post(f'/users/api/users/{self.candidate_user.id}/toggle_active/')
+        response = self.client.post(reverse('users:user-toggle-active', args=[self.candidate_user.id]))
         
-        if response.status_code == status.HTTP_200_OK:
-            self.candidate_user.refresh_from_db()
-            # Status should have changed
-            self.assertIsNotNone(self.candidate_user.is_active)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['is_active'])
+        is_active = User.objects.filter(pk=self.candidate_user.pk).values_list('is_active', flat=True)[0]
+        # Status should have changed
+        self.assertFalse(is_active)
+    
+    def test_list_reads_users_in_one_narrow_query(self):
+        """Test that the list page is one narrow SELECT on the user table"""
+        self.client.force_authenticate(user=self.admin_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.users_url)
+        self.assertEqual(response.status_code, 200)
+        
+        table = User._meta.db_table
+        selects = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT') and f'FROM "{table}"' in q['sql']
+            and 'COUNT(' not in q['sql'] and 'MAX(' not in q['sql']
+        ]
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn('"password"', selects[0])
+    
+    def test_candidate_can_only_see_own_profile(self):
+        """Test that candidate can only see their own profile"""
+        self.client.force_authenticate(user=self.candidate_user)
+        response = self.client.get(self.users_url)
+        self.assertIn(response.status_code, [200, 403, 404])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['id'], self.candidate_user.id)
+    
+    def test_user_can_get_own_profile(self):
+        """Test that any authenticated user can get their own profile"""
+        self.client.force_authenticate(user=self.candidate_user)
+        response = self.client.get(reverse('users:user-me'))
+        self.assertIn(response.status_code, [200, 403, 404])
+        self.assertEqual(response.data['id'], self.candidate_user.id)
+    
+    def test_role_assignment_validation(self):
+        """Test role assignment and validation"""
+        roles = [
+            (self.admin_user, 'admin'),
+            (self.recruiter_user, 'recruteur'),
+            (self.candidate_user, 'candidat')
+        ]
+        
+        for user, expected_role in roles:
+            self.assertEqual(user.role, expected_role)
+            self.assertTrue(user.is_active)  # All users should be active by default
+    
+    def test_non_admin_cannot_create_user(self):
+        """Test that non-admin users cannot create users"""
+        self.client.force_authenticate(user=self.recruiter_user)
+        data = {
+            'username': 'new_user',
+            'email': 'new@test.com',
+            'password': 'newpass123',
+            'password_confirm': 'newpass123',
+            'role': 'candidat'
+        }
+        response = self.client.post(self.users_url, data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_change_role_rejects_invalid_roles(self):
+        """Test that unknown and non-string roles are rejected with 400"""
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse('users:user-change-role', args=[self.candidate_user.id])
+        for role in ('superuser', ['admin']):
+            with self.subTest(role=role):
+                response = self.client.post(url, {'role': role}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_non_admin_cannot_change_role(self):
+        """Test that non-admin users cannot change roles"""
+        self.client.force_authenticate(user=self.recruiter_user)
+        response = self.client.post(
+            reverse('users:user-change-role', args=[self.candidate_user.id]),
+            {'role': 'recruteur'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['detail'], 'Permission denied. Admin access required.')
 
 
 class UserPermissionsTestCase(TestCase):
     """Test cases for user permissions and role-based access"""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.admin = User.objects.create_user(
-            username='admin',
-            email='admin@example.com',
-            password='testpass123',
-            role='admin'
-        )
-        
-        self.recruiter = User.objects.create_user(
-            username='recruiter',
-            email='recruiter@example.com',
-            password='testpass123',
-            role='recruteur'
-        )
-        
-        self.candidate = User.objects.create_user(
-            username='candidate',
-            email='candidate@example.com',
-            password='testpass123',
-            role='candidat'
-        )
-    
-    def test_admin_role_permissions(self):
-        """Test admin role and permissions"""
-        self.assertEqual(self.admin.role, 'admin')
-        # Test any admin-specific properties or methods
-    
-    def test_recruiter_role_permissions(self):
-        """Test recruiter role and permissions"""
-        self.assertEqual(self.recruiter.role, 'recruteur')
+        # One password hash and one INSERT for all three users
+        password = make_password('testpass123')
+        cls.admin, cls.recruiter, cls.candidate = User.objects.bulk_create([
+            User(username='admin', email='admin@example.com', password=password, role='admin'),
+            User(username='recruiter', email='recruiter@example.com', password=password, role='recruteur'),
+            User(username='candidate', email='candidate@example.com', password=password, role='candidat'),
+        ])
     
-    def test_candidate_role_permissions(self):
-        """Test candidate role and permissions"""
-        self.assertEqual(self.candidate.role, 'candidat')
+    def test_role_permissions(self):
+        """Test that each fixture user carries its role"""
+        for user, expected in [
+            (self.admin, 'admin'),
+            (self.recruiter, 'recruteur'),
+            (self.candidate, 'candidat'),
+        ]:
+            with self.subTest(role=expected):
+                self.assertEqual(user.role, expected)
+    
+    def test_permission_classes_by_role(self):
+        """Test the role permission classes and their per-request memoization"""
+        from rest_framework.test import APIRequestFactory
+        from rest_framework.request import Request
+        from .permissions import IsAdminUser, IsAdminOrRecruiter
+        
+        factory = APIRequestFactory()
+        for user, is_admin, is_staff_role in [
+            (self.admin, True, True),
+            (self.recruiter, False, True),
+            (self.candidate, False, False),
+        ]:
+            request = Request(factory.get('/'))
+            request.user = user
+            self.assertEqual(IsAdminUser().has_permission(request, None), is_admin)
+            self.assertEqual(IsAdminOrRecruiter().has_permission(request, None), is_staff_role)
+            
+            with patch.object(IsAdminUser, 'check_permission') as check:
+                IsAdminUser().has_permission(request, None)
+                check.assert_not_called()
     
     def test_role_based_queryset_filtering(self):
         """Test that querysets are filtered based on roles"""
@@ -266,55 +375,156 @@ class UserPermissionsTestCase(TestCase):
         pass
 
 
-class UserViewsTestCase(TestCase):
-    """Test cases for user template views"""
-    
-    def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123',
-            role='candidat'
-        )
-        self.client.login(username='testuser', password='testpass123')
+# Rate limiting and the CSRF session both live in the cache, keeping these tests off the database
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    SESSION_ENGINE='django.contrib.sessions.backends.cache'
+)
+class UserPublicViewsTestCase(SimpleTestCase):
+    """Test cases for template views reachable without a user, no database needed"""
     
     def test_home_view_accessible(self):
         """Test that home view is accessible"""
-        response = self.client.get('/')
+        response = self.client.get(reverse('users:home'))
         self.assertEqual(response.status_code, 200)
     
     def test_login_view_accessible(self):
         """Test that login view is accessible"""
-        self.client.logout()
-        response = self.client.get('/login/')
+        response = self.client.get(reverse('users:login'))
         self.assertEqual(response.status_code, 200)
     
     def test_register_view_accessible(self):
         """Test that register view is accessible"""
-        self.client.logout()
-        response = self.client.get('/register/')
+        response = self.client.get(reverse('users:register'))
         self.assertEqual(response.status_code, 200)
     
+    def test_auth_views_are_not_cached_and_reject_other_methods(self):
+        """Test that login and register pages are never cached and only accept GET/POST"""
+        for name in ('users:login', 'users:register'):
+            with self.subTest(view=name):
+                response = self.client.get(reverse(name))
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertEqual(self.client.put(reverse(name)).status_code, 405)
+    
     def test_profile_view_requires_authentication(self):
         """Test that profile view requires authentication"""
-        self.client.logout()
-        response = self.client.get('/profile/')
+        response = self.client.get(reverse('users:profile'))
         # Should redirect to login or return 401/403
         self.assertIn(response.status_code, [302, 401, 403])
+
+
+class UserViewsTestCase(TestCase):
+    """Test cases for user template views"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data"""
+        cls.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            role='candidat'
+        )
+    
+    def setUp(self):
+        self.client.force_login(self.user)
+    
+    def test_home_view_authenticated(self):
+        """Test that home view renders for a logged-in user"""
+        response = self.client.get(reverse('users:home'))
+        self.assertEqual(response.status_code, 200)
+    
+    def test_home_view_cache_is_anonymous_only(self):
+        """Test that the cached anonymous home page is never served to a logged-in user"""
+        self.client.logout()
+        self.client.get(reverse('users:home'))
+        
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('users:home'))
+        self.assertContains(response, 'Bienvenue, testuser')
     
     def test_profile_view_authenticated(self):
         """Test profile view when authenticated"""
-        response = self.client.get('/profile/')
+        response = self.client.get(reverse('users:profile'))
+        self.assertEqual(response.status_code, 200)
+    
+    def test_profile_update_saves_edited_fields(self):
+        """Test that the profile form persists an edited field"""
+        data = {
+            'username': 'testuser',
+            'email': 'test@example.com',
+            'first_name': 'Jean',
+            'last_name': 'Dupont',
+            'phone': ''
+        }
+        response = self.client.post(reverse('users:profile'), data)
+        
+        self.assertRedirects(response, reverse('users:profile'))
+        first_name, last_name = User.objects.filter(pk=self.user.pk).values_list('first_name', 'last_name')[0]
+        self.assertEqual((first_name, last_name), ('Jean', 'Dupont'))
+    
+    def test_users_list_view_loads_only_rendered_columns(self):
+        """Test that the admin users page does not load credential columns"""
+        admin = User.objects.create_user(username='listadmin', password='testpass123', role='admin')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('users:list'))
+        
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['users']), 2)
+        self.assertIn('password', response.context['users'][0].get_deferred_fields())
+    
+    def test_users_list_view_search_ignores_surrounding_spaces(self):
+        """Test that the search term is stripped and blank terms do not filter"""
+        admin = User.objects.create_user(username='listadmin', password='testpass123', role='admin')
+        self.client.force_login(admin)
+        
+        response = self.client.get(reverse('users:list'), {'search': '  testuser  '})
+        self.assertEqual(len(response.context['users']), 1)
+        
+        response = self.client.get(reverse('users:list'), {'search': '   '})
+        self.assertEqual(len(response.context['users']), 2)
+    
+    def test_users_list_view_redirects_non_admin(self):
+        """Test that admin_required sends non-admin users back home"""
+        response = self.client.get(reverse('users:list'))
+        self.assertRedirects(response, reverse('users:home'), fetch_redirect_response=False)
+        
+        self.client.logout()
+        response = self.client.get(reverse('users:list'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('?next=', response['Location'])
+    
+    def test_users_list_view_keyset_pagination(self):
+        """Test that the next cursor resumes right after the last listed user"""
+        admin = User.objects.create_user(username='listadmin', password='testpass123', role='admin')
+        User.objects.bulk_create([
+            User(username=f'pageuser{i}', email=f'pageuser{i}@example.com', role='candidat')
+            for i in range(25)
+        ])
+        self.client.force_login(admin)
+        
+        response = self.client.get(reverse('users:list'))
+        first_page = response.context['users']
+        next_cursor = response.context['next_cursor']
+        self.assertEqual(len(first_page), 20)
+        self.assertEqual(next_cursor['after_id'], first_page[-1].pk)
+        
+        response = self.client.get(reverse('users:list'), next_cursor)
+        second_page = response.context['users']
+        self.assertEqual(len(second_page), 7)
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertFalse({u.pk for u in first_page} & {u.pk for u in second_page})
 
 
 class UserIntegrationTestCase(TestCase):
     """Integration tests for user functionality"""
     
-    def setUp(self):
+    client_class = APIClient
+    
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.client = APIClient()
+        cls.users_url = reverse('users:user-list')
     
     def test_complete_user_lifecycle(self):
         """Test complete user creation, update, and management workflow"""
@@ -336,7 +546,7 @@ class UserIntegrationTestCase(TestCase):
             'role': 'recruteur'
         }
         
-        response = self.client.post('/users/api/users/', recruiter_data)
+        response = self.client.post(self.users_url, recruiter_data)
         if response.status_code == status.HTTP_201_CREATED:
             recruiter_id = response.data['id']
         else:
@@ -348,7 +558,7 @@ class UserIntegrationTestCase(TestCase):
         recruiter = User.objects.get(id=recruiter_id)
         self.client.force_authenticate(user=recruiter)
         
-        response = self.client.get(f'/users/api/users/{recruiter_id}/')
+        response = self.client.get(reverse('users:user-detail', args=[recruiter_id]))
         if response.status_code == status.HTTP_200_OK:
             self.assertEqual(response.data['role'], 'recruteur')
         
@@ -383,7 +593,7 @@ class UserIntegrationTestCase(TestCase):
         self.client.force_authenticate(user=user)
         
         # Access protected endpoint
-        response = self.client.get('/users/api/users/me/')
+        response = self.client.get(reverse('users:user-me'))
         # Should either work or give a specific error
         self.assertIn(response.status_code, [200, 404, 405])
     
@@ -398,36 +608,57 @@ class UserIntegrationTestCase(TestCase):
             {'username': 'candidate2', 'role': 'candidat'},
         ]
         
-        created_users = []
-        for data in users_data:
-            user = User.objects.create_user(
+        # One hash and one INSERT for all users; is_active is left to its default
+        password = make_password('testpass123')
+        created_users = User.objects.bulk_create([
+            User(
                 username=data['username'],
                 email=f"{data['username']}@example.com",
-                password='testpass123',
+                password=password,
                 role=data['role']
             )
-            created_users.append(user)
+            for data in users_data
+        ])
         
-        # Verify role distribution
-        admin_count = User.objects.filter(role='admin').count()
-        recruiter_count = User.objects.filter(role='recruteur').count()
-        candidate_count = User.objects.filter(role='candidat').count()
+        # Verify role distribution in one GROUP BY query.
+        # order_by() clears Meta.ordering, which would otherwise split the groups.
+        rows = list(
+            User.objects.order_by().values('role').annotate(
+                count=Count('id'),
+                active=Count('id', filter=Q(is_active=True))
+            )
+        )
+        counts = {row['role']: row['count'] for row in rows}
         
-        self.assertGreaterEqual(admin_count, 1)
-        self.assertGreaterEqual(recruiter_count, 2)
-        self.assertGreaterEqual(candidate_count, 2)
+        self.assertGreaterEqual(counts.get('admin', 0), 1)
+        self.assertGreaterEqual(counts.get('recruteur', 0), 2)
+        self.assertGreaterEqual(counts.get('candidat', 0), 2)
         
-        # Verify all users are active by default
-        active_users = User.objects.filter(is_active=True).count()
+        # Verify all users are active by default, read from the same query
+        active_users = sum(row['active'] for row in rows)
         self.assertEqual(active_users, len(created_users))
+    
+    def test_create_sample_users_command(self):
+        """Test that sample users get their email preferences and reruns are no-ops"""
+        from notifications.models import EmailPreferences
+        
+        call_command('create_sample_users', '--create-samples', stdout=StringIO())
+        usernames = ['admin_user', 'recruteur_user', 'candidat_user']
+        self.assertEqual(User.objects.filter(username__in=usernames).count(), 3)
+        self.assertEqual(EmailPreferences.objects.filter(user__username__in=usernames).count(), 3)
+        
+        out = StringIO()
+        call_command('create_sample_users', '--create-samples', stdout=out)
+        self.assertIn('already exist', out.getvalue())
 
 
 class UserSecurityTestCase(TestCase):
     """Test cases for user security features"""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='securitytest',
             email='security@example.com',
             password='testpass123',
@@ -461,161 +692,82 @@ class UserSecurityTestCase(TestCase):
         # that prevent role escalation
 
 
-class UserManagementTestCase(TestCase):
-    """
-    Test cases for user management with role-based access control
-    """
+class UserAdminTestCase(TestCase):
+    """Test cases for the user admin"""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data"""
-        self.client = APIClient()
-        
-        # Create test users with different roles
-        self.admin_user = User.objects.create_user(
-            username='admin_test',
-            email='admin@test.com',
-            password='testpass123',
-            role='admin'
-        )
-        
-        self.recruiter_user = User.objects.create_user(
-            username='recruiter_test',
-            email='recruiter@test.com',
-            password='testpass123',
-            role='recruteur'
+        cls.superuser = User.objects.create_superuser(
+            username='superadmin',
+            email='superadmin@example.com',
+            password='testpass123'
         )
-        
-        self.candidate_user = User.objects.create_user(
-            username='candidate_test',
-            email='candidate@test.com',
+        cls.staff = User.objects.create_user(
+            username='staffuser',
+            email='staff@example.com',
             password='testpass123',
-            role='candidat'
+            role='recruteur',
+            is_staff=True
         )
     
-    def test_admin_can_list_all_users(self):
-        """Test that admin can see all users"""
-        self.client.force_authenticate(user=self.admin_user)
-        response = self.client.get('/users/api/users/')
-        self.assertIn(response.status_code, [200, 403, 404])
+    def test_changelist_lists_users_for_superuser(self):
+        """Test that superusers see every user on the changelist"""
+        self.client.force_login(self.superuser)
+        response = self.client.get(reverse('admin:users_user_changelist'))
         
-        # Check if response has results key (paginated) or is direct list
-        if 'results' in response.data:
-            user_count = len(response.data['results'])
-        else:
-            user_count = len(response.data)
-        
-        self.assertGreaterEqual(user_count, 3)
-    
-    def test_recruiter_has_limited_access(self):
-        """Test that recruiter has appropriate access level"""
-        self.client.force_authenticate(user=self.recruiter_user)
-        response = self.client.get('/users/api/users/')
-        # Response should be successful or appropriately restricted
-        self.assertIn(response.status_code, [
-            status.HTTP_200_OK, 
-            status.HTTP_403_FORBIDDEN,
-            status.HTTP_401_UNAUTHORIZED
-        ])
-    
-    def test_candidate_has_minimal_access(self):
-        """Test that candidate has minimal access"""
-        self.client.force_authenticate(user=self.candidate_user)
-        response = self.client.get('/users/api/users/')
-        # Candidates should have restricted access
-        self.assertIn(response.status_code, [
-            status.HTTP_200_OK,  # If filtered results
-            status.HTTP_403_FORBIDDEN,
-            status.HTTP_401_UNAUTHORIZED
-        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 2)
+        self.assertIn('password', response.context['cl'].result_list[0].get_deferred_fields())
     
-    def test_role_assignment_validation(self):
-        """Test role assignment and validation"""
-        # Test that roles are properly assigned
-        self.assertEqual(self.admin_user.role, 'admin')
-        self.assertEqual(self.recruiter_user.role, 'recruteur')
-        self.assertEqual(self.candidate_user.role, 'candidat')
-    
-    def test_user_permissions_by_role(self):
-        """Test different permissions based on user roles"""
-        # Admin should have admin privileges
-        if hasattr(self.admin_user, 'is_staff'):
-            # This depends on your user model implementation
-            pass
-        
-        # Test role-specific permissions
-        roles = [
-            (self.admin_user, 'admin'),
-            (self.recruiter_user, 'recruteur'),
-            (self.candidate_user, 'candidat')
-        ]
+    def test_change_form_loads_full_user(self):
+        """Test that the change form is not restricted to changelist columns"""
+        self.client.force_login(self.superuser)
+        response = self.client.get(reverse('admin:users_user_change', args=[self.staff.pk]))
         
-        for user, expected_role in roles:
-            self.assertEqual(user.role, expected_role)
-            self.assertTrue(user.is_active)  # All users should be active by default
-        response = self.client.get('/api/users/')
-        self.assertIn(response.status_code, [200, 403, 404])
-        # Should see recruiter and candidate, but not admin
-        self.assertEqual(len(response.data['results']), 2)
-    
-    def test_candidate_can_only_see_own_profile(self):
-        """Test that candidate can only see their own profile"""
-        self.client.force_authenticate(user=self.candidate_user)
-        response = self.client.get('/api/users/')
-        self.assertIn(response.status_code, [200, 403, 404])
-        self.assertEqual(len(response.data['results']), 1)
-        self.assertEqual(response.data['results'][0]['id'], self.candidate_user.id)
-    
-    def test_admin_can_create_user(self):
-        """Test that admin can create new users"""
-        self.client.force_authenticate(user=self.admin_user)
-        data = {
-            'username': 'new_user',
-            'email': 'new@test.com',
-            'password': 'newpass123',
-            'password_confirm': 'newpass123',
-            'role': 'candidat',
-            'first_name': 'New',
-            'last_name': 'User'
-        }
-        response = self.client.post('/api/users/', data)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['original'].get_deferred_fields(), set())
+
+
+class UserListConditionalGetTestCase(TestCase):
+    """Test cases for ETag support on the user list endpoint"""
     
-    def test_non_admin_cannot_create_user(self):
-        """Test that non-admin users cannot create users"""
-        self.client.force_authenticate(user=self.recruiter_user)
-        data = {
-            'username': 'new_user',
-            'email': 'new@test.com',
-            'password': 'newpass123',
-            'password_confirm': 'newpass123',
-            'role': 'candidat'
-        }
-        response = self.client.post('/api/users/', data)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    client_class = APIClient
     
-    def test_user_can_get_own_profile(self):
-        """Test that any authenticated user can get their own profile"""
-        self.client.force_authenticate(user=self.candidate_user)
-        response = self.client.get('/api/users/me/')
-        self.assertIn(response.status_code, [200, 403, 404])
-        self.assertEqual(response.data['id'], self.candidate_user.id)
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data"""
+        cls.admin_user = User.objects.create_user(
+            username='etag_admin',
+            email='etag_admin@example.com',
+            password='testpass123',
+            role='admin'
+        )
     
-    def test_admin_can_change_user_role(self):
-        """Test that admin can change user roles"""
+    def setUp(self):
         self.client.force_authenticate(user=self.admin_user)
-        response = self.client.post(
-            f'/api/users/{self.candidate_user.id}/change_role/',
-            {'role': 'recruteur'}
-        )
-        self.assertIn(response.status_code, [200, 403, 404])
-        self.candidate_user.refresh_from_db()
-        self.assertEqual(self.candidate_user.role, 'recruteur')
     
-    def test_non_admin_cannot_change_role(self):
-        """Test that non-admin users cannot change roles"""
-        self.client.force_authenticate(user=self.recruiter_user)
-        response = self.client.post(
-            f'/api/users/{self.candidate_user.id}/change_role/',
-            {'role': 'recruteur'}
+    def test_unchanged_list_returns_not_modified(self):
+        """Test that polling with a current ETag returns 304"""
+        url = reverse('users:user-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+    
+    def test_user_change_invalidates_etag(self):
+        """Test that saving a user changes the list ETag"""
+        url = reverse('users:user-list')
+        etag = self.client.get(url)['ETag']
+        
+        User.objects.create_user(
+            username='etag_new',
+            email='etag_new@example.com',
+            password='testpass123'
         )
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -8,7 +8,7 @@ from .views import (
 app_name = 'users'
 
 router = DefaultRouter()
-router.register(r'users', UserViewSet)
+router.register(r'users', UserViewSet, basename='user')
 
 urlpatterns = [
     # API endpoints
@@ -1,23 +1,85 @@
+import functools
+import hashlib
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model, authenticate, login, logout
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponseRedirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth.forms import AuthenticationForm
-from django.core.paginator import Paginator
-from django.db.models import Q, Count, Prefetch
+from django.db import transaction
+from django.db.models import F, Q, Count, Max, Prefetch
 from django.core.cache import cache
-from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition, require_http_methods
+from django.views.decorators.cache import cache_page, never_cache
+from django.views.decorators.debug import sensitive_post_parameters
+from django.views.decorators.vary import vary_on_cookie
 from django.utils.decorators import method_decorator
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from .serializers import UserSerializer, UserListSerializer, UserUpdateSerializer
+from .cache import USERS_LIST_STATE_CACHE_KEY, invalidate_users_list_state
 from .permissions import IsAdminUser, IsOwnerOrAdmin, IsAdminOrRecruiter
 from .forms import CustomUserCreationForm, UserProfileForm, CustomAuthenticationForm
 
 User = get_user_model()
 
+# Role values accepted by change_role, built once instead of per request
+VALID_ROLES = frozenset(User.Role.values)
+
+USERS_LIST_PAGE_SIZE = 20
+
+# Columns rendered by users/list.html
+USERS_LIST_PAGE_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name',
+    'role', 'phone', 'is_active', 'created_at'
+)
+
+
+@functools.cache
+def cached_reverse(viewname):
+    """reverse() once per URL name; the site is served under a single script prefix"""
+    return reverse(viewname)
+
+
+def admin_required(view_func):
+    """
+    Template view decorator: login required, then redirect non-admins home.
+    API actions use the IsAdminUser permission class instead.
+    """
+    @login_required
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_admin:
+            messages.error(request, 'Accès non autorisé.')
+            return HttpResponseRedirect(cached_reverse('users:home'))
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def get_users_list_state():
+    """
+    Return the user count and latest update, cached for a few seconds.
+    Invalidated by the post_save/post_delete receivers in users.signals.
+    """
+    return cache.get_or_set(
+        USERS_LIST_STATE_CACHE_KEY,
+        lambda: User.objects.aggregate(count=Count('id'), last_updated=Max('updated_at')),
+        timeout=5
+    )
+
+
+def users_list_etag(request, *args, **kwargs):
+    """ETag for the user list, scoped to the requesting user since results depend on the role"""
+    state = get_users_list_state()
+    user = request.user
+    raw = f"{user.pk}:{getattr(user, 'role', '')}:{state['count']}:{state['last_updated']}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
 
 class UserViewSet(viewsets.ModelViewSet):
     """
@@ -26,34 +88,42 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     
+    # Per-action serializers and permissions, looked up instead of branching per request
+    serializer_classes = {
+        'list': UserListSerializer,
+        'update': UserUpdateSerializer,
+        'partial_update': UserUpdateSerializer,
+    }
+    # Actions whose response is rendered with UserListSerializer
+    list_serializer_actions = ('list', 'change_role', 'toggle_active')
+    action_permission_classes = {
+        # Only admins can create users
+        'create': [IsAdminUser],
+        # Admins can edit any user, users can edit their own profile
+        'update': [IsOwnerOrAdmin],
+        'partial_update': [IsOwnerOrAdmin],
+        'destroy': [IsOwnerOrAdmin],
+        # All authenticated users can list (filtered by role in get_queryset)
+        'list': [IsAuthenticated],
+    }
+    
     def get_serializer_class(self):
         """
         Return different serializers based on action
         """
-        if self.action == 'list':
-            return UserListSerializer
-        elif self.action in ['update', 'partial_update']:
-            return UserUpdateSerializer
-        return UserSerializer
+        return self.serializer_classes.get(self.action, UserSerializer)
     
     def get_permissions(self):
         """
         Instantiate and return the list of permissions that this view requires.
+        Actions not listed use their @action permission_classes or the authenticated-only default.
+        Built once per request, DRF asks again for object-level checks.
         """
-        if self.action == 'create':
-            # Only admins can create users
-            permission_classes = [IsAdminUser]
-        elif self.action in ['update', 'partial_update', 'destroy']:
-            # Admins can edit any user, users can edit their own profile
-            permission_classes = [IsOwnerOrAdmin]
-        elif self.action == 'list':
-            # All authenticated users can list (filtered by role in get_queryset)
-            permission_classes = [IsAuthenticated]
-        else:
-            # Default: authenticated users only
-            permission_classes = [IsAuthenticated]
-        
-        return [permission() for permission in permission_classes]
+        permissions = getattr(self, '_permissions', None)
+        if permissions is None:
+            permission_classes = self.action_permission_classes.get(self.action, self.permission_classes)
+            permissions = self._permissions = [permission() for permission in permission_classes]
+        return permissions
     
     def get_queryset(self):
         """
@@ -61,24 +131,33 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         user = self.request.user
         
-        # Base queryset optimization
-        queryset = User.objects.select_related()
+        # Base queryset optimization, credential columns are deferred.
+        # No list or detail serializer follows a relation, so nothing to join.
+        queryset = User.api_objects.all()
+        if self.action in self.list_serializer_actions:
+            # Only fetch the columns the list serializer renders
+            queryset = queryset.only(*UserListSerializer.model_fields)
+        if self.action == 'list':
+            # The id tie-breaker keeps pages stable when users share a created_at (bulk imports)
+            queryset = queryset.order_by('-created_at', '-id')
         
         if user.is_admin:
             # Admins can see all users
             return queryset.all()
         elif user.is_recruiter:
             # Recruiters can see candidates and other recruiters
-            return queryset.filter(role__in=['candidat', 'recruteur'])
+            return queryset.filter(role__in=[User.Role.CANDIDATE, User.Role.RECRUITER])
         else:
             # Candidates can only see their own profile
             return queryset.filter(id=user.id)
     
-    @method_decorator(cache_page(300))  # Cache for 5 minutes
+    @method_decorator(condition(etag_func=users_list_etag))
     def list(self, request, *args, **kwargs):
         """
-        List users with caching
+        List users, answering unchanged polls with 304 Not Modified
         """
+        return super().list(request, *args, **kwargs)
+    
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def me(self, request):
         """
@@ -102,48 +181,39 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
     def change_role(self, request, pk=None):
         """
         Change user role (admin only)
         """
-        # Explicit permission check
-        if not request.user.is_admin:
-            return Response(
-                {'detail': 'Permission denied. Admin access required.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-            
         user = self.get_object()
         new_role = request.data.get('role')
         
-        if new_role not in ['admin', 'recruteur', 'candidat']:
+        # JSON bodies may carry non-string values, which a frozenset cannot hash
+        if not isinstance(new_role, str) or new_role not in VALID_ROLES:
             return Response(
                 {'error': 'Rôle invalide'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Single-column write; save() keeps post_save so the list state is invalidated
         user.role = new_role
-        user.save()
+        user.save(update_fields=['role', 'updated_at'])
         
         serializer = UserListSerializer(user)
         return Response(serializer.data)
     
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
     def toggle_active(self, request, pk=None):
         """
         Activate/deactivate user (admin only)
         """
-        # Explicit permission check
-        if not request.user.is_admin:
-            return Response(
-                {'detail': 'Permission denied. Admin access required.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-            
         user = self.get_object()
-        user.is_active = not user.is_active
-        user.save()
+        # Flip the flag in the database so concurrent toggles cannot overwrite each other
+        User.objects.filter(pk=user.pk).update(is_active=~F('is_active'), updated_at=timezone.now())
+        user.refresh_from_db(fields=['is_active', 'updated_at'])
+        # update() bypasses post_save, drop the list state here
+        invalidate_users_list_state()
         
         serializer = UserListSerializer(user)
         return Response(serializer.data)
@@ -151,19 +221,32 @@ class UserViewSet(viewsets.ModelViewSet):
 
 # ============ TEMPLATE-BASED VIEWS ============
 
+def render_home(request):
+    return render(request, 'home.html')
+
+
+# Anonymous visitors share one cached page; Vary: Cookie keeps flash messages separate
+cached_anonymous_home = cache_page(300)(vary_on_cookie(render_home))
+
+
 def home_view(request):
     """
-    Home page view
+    Home page view, cached for anonymous visitors only since it is personalized
     """
-    return render(request, 'home.html')
+    if request.user.is_authenticated:
+        return render_home(request)
+    return cached_anonymous_home(request)
 
 
+@sensitive_post_parameters('password', 'password1', 'password2')
+@never_cache
+@require_http_methods(['GET', 'POST'])
 def login_view(request):
     """
     Login view
     """
     if request.user.is_authenticated:
-        return redirect('users:home')
+        return HttpResponseRedirect(cached_reverse('users:home'))
     
     if request.method == 'POST':
         form = CustomAuthenticationForm(data=request.POST)
@@ -174,8 +257,10 @@ def login_view(request):
             if user is not None:
                 login(request, user)
                 messages.success(request, f'Bienvenue, {user.first_name or user.username} !')
-                next_url = request.GET.get('next', 'users:home')
-                return redirect(next_url)
+                next_url = request.GET.get('next')
+                if next_url:
+                    return redirect(next_url)
+                return HttpResponseRedirect(cached_reverse('users:home'))
         else:
             messages.error(request, 'Nom d\'utilisateur ou mot de passe incorrect.')
     else:
@@ -184,19 +269,24 @@ def login_view(request):
     return render(request, 'users/login.html', {'form': form})
 
 
+@sensitive_post_parameters('password', 'password1', 'password2')
+@never_cache
+@require_http_methods(['GET', 'POST'])
 def register_view(request):
     """
     Registration view
     """
     if request.user.is_authenticated:
-        return redirect('users:home')
+        return HttpResponseRedirect(cached_reverse('users:home'))
     
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
-            user = form.save()
+            # User row and the post_save rows (email preferences) commit together
+            with transaction.atomic():
+                user = form.save()
             messages.success(request, 'Votre compte a été créé avec succès ! Vous pouvez maintenant vous connecter.')
-            return redirect('users:login')
+            return HttpResponseRedirect(cached_reverse('users:login'))
         else:
             messages.error(request, 'Veuillez corriger les erreurs ci-dessous.')
     else:
@@ -211,7 +301,7 @@ def logout_view(request):
     """
     logout(request)
     messages.info(request, 'Vous avez été déconnecté avec succès.')
-    return redirect('users:home')
+    return HttpResponseRedirect(cached_reverse('users:home'))
 
 
 @login_required
@@ -222,9 +312,10 @@ def profile_view(request):
     if request.method == 'POST':
         form = UserProfileForm(request.POST, instance=request.user)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
             messages.success(request, 'Votre profil a été mis à jour avec succès.')
-            return redirect('users:profile')
+            return HttpResponseRedirect(cached_reverse('users:profile'))
         else:
             messages.error(request, 'Veuillez corriger les erreurs ci-dessous.')
     else:
@@ -240,9 +331,7 @@ def profile_view(request):
         candidatures_stats = cache.get(cache_key)
         
         if candidatures_stats is None:
-            # Optimized aggregation query instead of multiple filter queries
-            from django.db.models import Case, When, IntegerField
-            
+            # One query with conditional counts instead of one COUNT per status
             candidatures_stats = Candidature.objects.filter(
                 candidat=request.user
             ).aggregate(
@@ -262,19 +351,15 @@ def profile_view(request):
     })
 
 
-@login_required
+@admin_required
 def users_list_view(request):
     """
     Users list view (admin only)
     """
-    if not request.user.is_admin:
-        messages.error(request, 'Accès non autorisé.')
-        return redirect('users:home')
-    
-    users_queryset = User.objects.all().order_by('-created_at')
+    users_queryset = User.objects.only(*USERS_LIST_PAGE_FIELDS).order_by('-created_at', '-id')
     
-    # Search filter
-    search = request.GET.get('search')
+    # Search filter, blank terms would only add four unindexed LIKE scans
+    search = request.GET.get('search', '').strip()
     if search:
         users_queryset = users_queryset.filter(
             Q(first_name__icontains=search) |
@@ -288,12 +373,27 @@ def users_list_view(request):
     if role:
         users_queryset = users_queryset.filter(role=role)
     
-    # Pagination
-    paginator = Paginator(users_queryset, 20)
-    page_number = request.GET.get('page')
-    users = paginator.get_page(page_number)
+    # Keyset pagination: each page continues after the last row of the previous one,
+    # so deep pages cost the same as the first (no OFFSET scan, no COUNT query)
+    try:
+        after_created_at = parse_datetime(request.GET.get('after_created_at', ''))
+    except ValueError:
+        after_created_at = None
+    after_id = request.GET.get('after_id', '')
+    if after_created_at and after_id.isdigit():
+        users_queryset = users_queryset.filter(
+            Q(created_at__lt=after_created_at) |
+            Q(created_at=after_created_at, id__lt=int(after_id))
+        )
+    
+    users = list(users_queryset[:USERS_LIST_PAGE_SIZE + 1])
+    next_cursor = None
+    if len(users) > USERS_LIST_PAGE_SIZE:
+        users = users[:USERS_LIST_PAGE_SIZE]
+        last = users[-1]
+        next_cursor = {'after_created_at': last.created_at.isoformat(), 'after_id': last.pk}
     
-    return render(request, 'users/list.html', {'users': users})
+    return render(request, 'users/list.html', {'users': users, 'next_cursor': next_cursor})
 
 
 @login_required